@@ -2,16 +2,34 @@
 import sys
 import csv
 import json
+from multiprocessing import Pool
 from decimal import Decimal, InvalidOperation, getcontext
-from typing import List, Dict, Any, Tuple
+from functools import lru_cache
+from typing import List, Dict, Any, Iterator, Tuple
 
 from eth_abi import encode
 from eth_utils import keccak, to_checksum_address
 
+try:
+    from Crypto.Hash import keccak as _keccak  # pycryptodome, used by hash_pair
+except ImportError:
+    _keccak = None
+
 getcontext().prec = 80  # high precision for Decimal math
 
 WEI_PER_ETH = Decimal("1000000000000000000")
 
+# Leaf hashing is only farmed out to worker processes above this many leaves;
+# below it, process startup costs more than the hashing itself.
+PARALLEL_LEAF_THRESHOLD = 20000
+PARALLEL_CHUNKSIZE = 1024
+
+
+@lru_cache(maxsize=None)
+def _csum(addr: str) -> str:
+    """Memoized to_checksum_address (it keccaks the address); callers pass it lowercased."""
+    return to_checksum_address(addr)
+
 
 def parse_amount_to_wei(value: str, unit: str) -> int:
     """
@@ -49,6 +67,28 @@ def parse_amount_to_wei(value: str, unit: str) -> int:
     return int(wei)
 
 
+ADDRESS_PAD = b"\x00" * 12  # abi.encode left-pads a 20-byte address to 32 bytes
+
+
+def encode_leaf(account: str, amount_wei: int) -> bytes:
+    """
+    Inline equivalent of eth_abi encode(["address", "uint256"], [account, amount_wei]).
+
+    Both types are static, so the encoding is just two 32-byte words:
+      - address: 12 zero bytes + 20 address bytes
+      - uint256: 32-byte big-endian integer
+    """
+    return ADDRESS_PAD + bytes.fromhex(account[2:]) + amount_wei.to_bytes(32, "big")
+
+
+def check_leaf_encoding() -> None:
+    """Sanity check that encode_leaf matches eth_abi's encoding (run once at startup)."""
+    account = _csum("0x" + "ab" * 20)
+    amount_wei = 1036920000000700000000
+    if encode_leaf(account, amount_wei) != encode(["address", "uint256"], [account, amount_wei]):
+        raise SystemExit("Inline leaf encoding does not match eth_abi encode(address,uint256).")
+
+
 def hash_leaf(index: int, account: str, amount_wei: int) -> bytes:
     """
     Must match Solidity in your contract:
@@ -58,92 +98,126 @@ def hash_leaf(index: int, account: str, amount_wei: int) -> bytes:
     Notes:
     - index is NOT part of the leaf for this contract (kept only to preserve script structure / proof indexing).
     - This is a "double keccak": keccak( keccak(abi.encode(account, amount)) ).
+    - abi.encode is done inline by encode_leaf (see check_leaf_encoding).
     """
-    inner_encoded = encode(["address", "uint256"], [account, amount_wei])
+    inner_encoded = encode_leaf(account, amount_wei)
     inner_hash = keccak(inner_encoded)  # keccak256(abi.encode(account, amount))
     return keccak(inner_hash)           # keccak256(bytes.concat(inner_hash))
 
 
+LEAF_ENCODED_SIZE = 64  # abi.encode(address, uint256) is two 32-byte words
+
+
+def _hash_leaf_batch(pairs: List[Tuple[str, int]]) -> List[bytes]:
+    """
+    Hash a batch of (account, amount_wei) pairs, same as hash_leaf on each one.
+
+    The whole batch is ABI-encoded into one buffer with a single join, then each
+    64-byte slice gets the double keccak. Module-level so multiprocessing.Pool
+    can pickle it.
+    """
+    blob = b"".join([encode_leaf(account, amount_wei) for account, amount_wei in pairs])
+    return [
+        keccak(keccak(blob[o:o + LEAF_ENCODED_SIZE]))
+        for o in range(0, len(blob), LEAF_ENCODED_SIZE)
+    ]
+
+
+def hash_leaves(pairs: List[Tuple[str, int]]) -> List[bytes]:
+    """
+    Hash (account, amount_wei) pairs into leaves, preserving order.
+    Leaves are independent, so large inputs are hashed in chunks across all cores.
+    """
+    if len(pairs) < PARALLEL_LEAF_THRESHOLD:
+        return _hash_leaf_batch(pairs)
+    chunks = [pairs[i:i + PARALLEL_CHUNKSIZE] for i in range(0, len(pairs), PARALLEL_CHUNKSIZE)]
+    with Pool() as pool:
+        return [leaf for batch in pool.map(_hash_leaf_batch, chunks) for leaf in batch]
+
+
 def hash_pair(a: bytes, b: bytes) -> bytes:
     """
     Node hash compatible with OpenZeppelin MerkleProof sorted-pair assumption:
     keccak256(min(a,b) || max(a,b))
+
+    With pycryptodome, the pair is hashed by its keccak directly, skipping the
+    eth_utils/eth-hash wrapper layers around the same C implementation.
     """
-    return keccak(a + b) if a <= b else keccak(b + a)
+    lo, hi = (a, b) if a <= b else (b, a)
+    if _keccak is None:
+        return keccak(lo + hi)
+    return _keccak.new(digest_bits=256, data=lo + hi).digest()
+
+
+NODE_SIZE = 32  # bytes per merkle node (bytes32)
 
 
-def build_layers(leaves: List[bytes]) -> List[List[bytes]]:
+def build_layers(leaves: List[bytes]) -> List[bytearray]:
     """
-    Build merkle layers, duplicating last node when odd at each level.
-    layers[0] = leaves, layers[-1][0] = root
+    Build merkle layers, promoting the last node unchanged when a level is odd.
+
+    Each layer is a single flat bytearray of 32-byte nodes (node i lives at
+    [i * NODE_SIZE, (i + 1) * NODE_SIZE)) rather than a list of bytes objects.
+    layers[0] = leaves, layers[-1] = root
+
+    Leaves are NOT padded to a power of two: padding changes the root, and the
+    promote-odd construction is what the published merkleRoot was built with.
+    The pair loop is still branch-free; the odd node is handled once per level.
     """
     if not leaves:
         raise ValueError("No leaves (empty input).")
 
-    layers = [leaves]
-    while len(layers[-1]) > 1:
+    layers = [bytearray(b"".join(leaves))]
+    while len(layers[-1]) > NODE_SIZE:
         cur = layers[-1]
-        nxt: List[bytes] = []
-        i = 0
-        # while i < len(cur):
-        #     left = cur[i]
-        #     right = cur[i + 1] if (i + 1) < len(cur) else cur[i]  # duplicate last if odd
-        #     nxt.append(hash_pair(left, right))
-        #     i += 2
-        while i < len(cur):
-            left = cur[i]
-            if (i + 1) < len(cur):
-                right = cur[i + 1]
-                nxt.append(hash_pair(left, right))
-                i += 2
-            else:
-                # promote odd node (carry up unchanged)
-                nxt.append(left)
-                i += 1
+        n = len(cur) // NODE_SIZE
+        nxt = bytearray(((n + 1) // 2) * NODE_SIZE)
+        o = 0
+        # Step over the level in 64-byte strides; slices are compared and hashed
+        # as-is, without an extra bytes() copy per node.
+        for p in range(0, (n // 2) * 2 * NODE_SIZE, 2 * NODE_SIZE):
+            nxt[o:o + NODE_SIZE] = hash_pair(cur[p:p + NODE_SIZE], cur[p + NODE_SIZE:p + 2 * NODE_SIZE])
+            o += NODE_SIZE
+        if n % 2 == 1:
+            # promote odd node (carry up unchanged)
+            nxt[o:o + NODE_SIZE] = cur[(n - 1) * NODE_SIZE:]
         layers.append(nxt)
     return layers
 
 
-# def get_proof(layers: List[List[bytes]], leaf_index: int) -> List[str]:
-#     """
-#     Proof is list of sibling hashes (bytes32) from leaf level up to (but excluding) root.
-#     """
-#     proof: List[str] = []
-#     idx = leaf_index
-#
-#     for level in range(len(layers) - 1):
-#         layer = layers[level]
-#         sibling_idx = idx ^ 1
-#         if sibling_idx < len(layer):
-#             sibling = layer[sibling_idx]
-#         else:
-#             sibling = layer[idx]  # duplicated last node case
-#         proof.append("0x" + sibling.hex())
-#         idx //= 2
-#
-#     return proof
-def get_proof(layers: List[List[bytes]], leaf_index: int) -> List[str]:
-    """
-    Proof compatible with "promote odd nodes" construction:
-    If a node is the last element of an odd-length level, it is promoted and has no sibling,
-    so we do NOT append anything to the proof at that level.
+def iter_all_proofs(layers: List[bytearray]) -> Iterator[List[str]]:
     """
-    proof: List[str] = []
-    idx = leaf_index
+    Yield the proof of every leaf, in leaf order.
 
-    for level in range(len(layers) - 1):
-        layer = layers[level]
+    A proof is the list of sibling hashes from the leaf level up to (but excluding) the
+    root. It matches the "promote odd nodes" construction: the last node of an odd-length
+    level is carried up unchanged and has no sibling, so nothing is added at that level.
 
-        # If this node was promoted (odd count and it's the last one), there's no sibling to add.
-        if (len(layer) % 2 == 1) and (idx == len(layer) - 1):
+    Level widths and the hex form of each node are computed once up front, so a
+    node shared by many proofs (everything near the root) is hex-encoded once
+    and the same string object is reused in each proof.
+    """
+    widths = [len(layer) // NODE_SIZE for layer in layers]
+    hex_layers = [
+        ["0x" + layer[o:o + NODE_SIZE].hex() for o in range(0, len(layer), NODE_SIZE)]
+        for layer in layers[:-1]
+    ]
+
+    for leaf_index in range(widths[0]):
+        proof: List[str] = []
+        idx = leaf_index
+        for level, hex_nodes in enumerate(hex_layers):
+            n = widths[level]
+            # Promoted odd node: no sibling at this level.
+            if not ((n % 2 == 1) and (idx == n - 1)):
+                proof.append(hex_nodes[idx ^ 1])
             idx //= 2
-            continue
+        yield proof
 
-        sibling_idx = idx ^ 1
-        proof.append("0x" + layer[sibling_idx].hex())
-        idx //= 2
 
-    return proof
+def json_indented(obj: Any, level: int) -> str:
+    """json.dumps(obj, indent=2) re-indented to sit `level` levels deep in an enclosing document."""
+    return json.dumps(obj, indent=2).replace("\n", "\n" + "  " * level)
 
 
 def usage() -> str:
@@ -179,109 +253,129 @@ def main() -> None:
         print(usage(), file=sys.stderr)
         raise SystemExit(2)
 
+    check_leaf_encoding()
+
     address_col = "wallet"
     amount_col = "rewardTotal"
 
-    # Read CSV
-    rows: List[Dict[str, str]] = []
+    # Stream CSV rows straight into values (no intermediate list of row dicts)
     try:
-        with open(input_csv, "r", newline="", encoding="utf-8") as f:
-            reader = csv.DictReader(f)
-            if reader.fieldnames is None:
-                raise SystemExit("Input CSV appears to have no header row.")
-            for r in reader:
-                rows.append(r)
+        f = open(input_csv, "r", newline="", encoding="utf-8")
     except FileNotFoundError:
         raise SystemExit(f"Input CSV not found: {input_csv!r}")
 
-    if not rows:
-        raise SystemExit("Input CSV has no data rows.")
-
-    # Validate required columns
-    header = set(rows[0].keys())
-    if address_col not in header:
-        raise SystemExit(f"Missing required column {address_col!r} in CSV header.")
-    if amount_col not in header:
-        raise SystemExit(f"Missing required column {amount_col!r} in CSV header.")
-
     # Normalize + prepare values
     # IMPORTANT CHANGE: skip rows with amount_wei == 0
     values: List[Tuple[int, str, int, Dict[str, Any]]] = []
+    input_rows = 0
     skipped_zero = 0
     total_amount_wei = 0
 
-    for row_idx, r in enumerate(rows):
-        addr_raw = (r.get(address_col) or "").strip()
-        if not addr_raw:
-            raise SystemExit(f"Row {row_idx+1}: empty wallet address.")
-
-        try:
-            account = to_checksum_address(addr_raw)
-        except Exception as e:
-            raise SystemExit(f"Row {row_idx+1}: invalid address {addr_raw!r}: {e}")
-
-        amt_raw = (r.get(amount_col) or "").strip()
-        if not amt_raw:
-            raise SystemExit(f"Row {row_idx+1}: empty rewardTotal.")
-
-        try:
-            amount_wei = parse_amount_to_wei(amt_raw, unit)
-        except Exception as e:
-            raise SystemExit(f"Row {row_idx+1}: bad rewardTotal {amt_raw!r}: {e}")
-
-        if amount_wei == 0:
-            skipped_zero += 1
-            continue
-
-        meta = dict(r)  # keep original row for auditing/UI (optional)
-        values.append((len(values), account, amount_wei, meta))
-        # Note: index is now contiguous among included claims (0..n-1)
-        total_amount_wei += amount_wei
+    with f:
+        reader = csv.DictReader(f)
+        if reader.fieldnames is None:
+            raise SystemExit("Input CSV appears to have no header row.")
+
+        # Validate required columns
+        header = set(reader.fieldnames)
+        if address_col not in header:
+            raise SystemExit(f"Missing required column {address_col!r} in CSV header.")
+        if amount_col not in header:
+            raise SystemExit(f"Missing required column {amount_col!r} in CSV header.")
+
+        for row_idx, r in enumerate(reader):
+            input_rows += 1
+
+            addr_raw = (r.get(address_col) or "").strip()
+            if not addr_raw:
+                raise SystemExit(f"Row {row_idx+1}: empty wallet address.")
+
+            try:
+                account = _csum(addr_raw.lower())
+            except Exception as e:
+                raise SystemExit(f"Row {row_idx+1}: invalid address {addr_raw!r}: {e}")
+
+            amt_raw = (r.get(amount_col) or "").strip()
+            if not amt_raw:
+                raise SystemExit(f"Row {row_idx+1}: empty rewardTotal.")
+
+            try:
+                amount_wei = parse_amount_to_wei(amt_raw, unit)
+            except Exception as e:
+                raise SystemExit(f"Row {row_idx+1}: bad rewardTotal {amt_raw!r}: {e}")
+
+            if amount_wei == 0:
+                skipped_zero += 1
+                continue
+
+            meta = r  # keep original row for auditing/UI (optional); DictReader yields a fresh dict per row
+            values.append((len(values), account, amount_wei, meta))
+            # Note: index is now contiguous among included claims (0..n-1)
+            total_amount_wei += amount_wei
+
+    if input_rows == 0:
+        raise SystemExit("Input CSV has no data rows.")
 
     if not values:
         raise SystemExit("All rows were skipped (no wallets with non-zero rewardTotal).")
 
     # Build leaves and merkle tree
-    leaves = [hash_leaf(i, account, amount_wei) for (i, account, amount_wei, _meta) in values]
+    leaves = hash_leaves([(account, amount_wei) for (_i, account, amount_wei, _meta) in values])
     layers = build_layers(leaves)
-    root = layers[-1][0]
+    root = bytes(layers[-1])
     root_hex = "0x" + root.hex()
 
-    # Build claims JSON
-    claims: Dict[str, Any] = {}
-    for (i, account, amount_wei, meta) in values:
-        proof = get_proof(layers, i)
-        claim_obj: Dict[str, Any] = {
-            "index": str(i),
-            "amountWei": str(amount_wei),
-            "proof": proof,
-            "csv": meta,  # remove if you want smaller file
-        }
-        if unit == "eth":
-            claim_obj["amountEth"] = str(Decimal(amount_wei) / WEI_PER_ETH)
-        claims[account] = claim_obj
-
-    out = {
-        "merkleRoot": root_hex,
-        "unit": "wei",
-        "leafEncoding": ["address", "uint256"],
-        "leafHash": "keccak256(bytes.concat(keccak256(abi.encode(account, amountWei))))",
-        "nodeHash": "keccak256(min(a,b) || max(a,b))  // sorted-pair hash",
-        "claims": claims,
-        "stats": {
-            "includedWallets": len(values),
-            "skippedZeroAmountWallets": skipped_zero,
-            "inputRows": len(rows),
-            "totalAmountWei": str(total_amount_wei),
-            **({"totalAmountEth": str(Decimal(total_amount_wei) / WEI_PER_ETH)} if unit == "eth" else {}),
-        },
+    # Write claims JSON incrementally: one claim object is built, written and
+    # dropped at a time. Layout matches json.dump(out, f, indent=2).
+    header_fields: List[Tuple[str, Any]] = [
+        ("merkleRoot", root_hex),
+        ("unit", "wei"),
+        ("leafEncoding", ["address", "uint256"]),
+        ("leafHash", "keccak256(bytes.concat(keccak256(abi.encode(account, amountWei))))"),
+        ("nodeHash", "keccak256(min(a,b) || max(a,b))  // sorted-pair hash"),
+    ]
+    stats: Dict[str, Any] = {
+        "includedWallets": len(values),
+        "skippedZeroAmountWallets": skipped_zero,
+        "inputRows": input_rows,
+        "totalAmountWei": str(total_amount_wei),
+        **({"totalAmountEth": str(Decimal(total_amount_wei) / WEI_PER_ETH)} if unit == "eth" else {}),
     }
 
+    # Claims are keyed by account. A repeated wallet keeps the position of its first
+    # row and the claim of its last one, as assigning into a claims dict would.
+    last_index = {account: i for (i, account, _amount_wei, _meta) in values}
+    if len(last_index) == len(values):
+        claims = zip(values, iter_all_proofs(layers))
+    else:
+        proofs = list(iter_all_proofs(layers))
+        claims = ((values[i], proofs[i]) for i in last_index.values())
+
     with open(output_json, "w", encoding="utf-8") as f:
-        json.dump(out, f, indent=2)
+        f.write("{\n")
+        for key, value in header_fields:
+            f.write(f"  {json.dumps(key)}: {json_indented(value, 1)},\n")
+
+        f.write('  "claims": {\n')
+        for n, ((i, account, amount_wei, meta), proof) in enumerate(claims):
+            claim_obj: Dict[str, Any] = {
+                "index": str(i),
+                "amountWei": str(amount_wei),
+                "proof": proof,
+                "csv": meta,  # remove if you want smaller file
+            }
+            if unit == "eth":
+                claim_obj["amountEth"] = str(Decimal(amount_wei) / WEI_PER_ETH)
+            if n:
+                f.write(",\n")
+            f.write(f"    {json.dumps(account)}: {json_indented(claim_obj, 2)}")
+        f.write("\n  },\n")
+
+        f.write(f'  "stats": {json_indented(stats, 1)}\n')
+        f.write("}")
 
     print("merkleRoot:", root_hex)
-    print("input rows:", len(rows))
+    print("input rows:", input_rows)
     print("included wallets:", len(values))
     print("skipped zero-amount wallets:", skipped_zero)
     print("wrote:", output_json)
@@ -109,7 +109,12 @@ Example:
 
 import csv
 import sys
-from typing import Dict, Set, Tuple
+from operator import itemgetter
+from typing import Dict, List, Set
+
+
+# Read buffer for the input CSVs: a few large reads instead of many 8 KiB ones.
+CSV_READ_BUFFER = 1 << 20
 
 
 # ---------------------------------------------------------------------------
@@ -117,70 +122,62 @@ from typing import Dict, Set, Tuple
 # ---------------------------------------------------------------------------
 
 def normalize_addr(addr: str) -> str:
-    """Normalize wallet address by stripping whitespace and lowercasing."""
+    """Normalize wallet address by stripping whitespace and lowercasing (interned: one string per wallet)."""
     if not addr:
         return ""
-    return addr.strip().lower()
+    # All three inputs are written lowercase by the earlier steps; skip the copy for those.
+    if addr[:2] == "0x" and addr.islower() and not addr[-1].isspace():
+        return sys.intern(addr)
+    return sys.intern(addr.strip().lower())
 
 
-def load_combined_vp(path: str) -> Dict[str, float]:
-    """Load CombinedVP.csv (wallet,combinedVP) into dict wallet->combinedVP."""
-    out: Dict[str, float] = {}
-    with open(path, "r", newline="", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        if "wallet" not in (reader.fieldnames or []) or "combinedVP" not in (reader.fieldnames or []):
-            raise ValueError(f"{path} must have columns: wallet,combinedVP")
+def _load_wallet_float(path: str, value_col: str, expected: str) -> Dict[str, float]:
+    """
+    Load a CSV with 'wallet' and `value_col` columns into dict wallet->float.
 
+    `expected` names the required columns in the error message. Empty or
+    unparsable values count as 0.0; rows without a wallet are skipped.
+    """
+    out: Dict[str, float] = {}
+    with open(path, "r", newline="", encoding="utf-8", buffering=CSV_READ_BUFFER) as f:
+        reader = csv.reader(f)
+        header = next(reader, [])
+        if "wallet" not in header or value_col not in header:
+            raise ValueError(f"{path} must have {expected}")
+
+        # Resolve column positions once; rows are plain lists (no per-row dict).
+        i_wallet = header.index("wallet")
+        i_value = header.index(value_col)
+        ncols = len(header)
+        _norm = normalize_addr
+        _float = float
         for row in reader:
-            w = normalize_addr(row.get("wallet") or "")
+            if len(row) < ncols:
+                row += [""] * (ncols - len(row))
+            w = _norm(row[i_wallet])
             if not w:
                 continue
             try:
-                vp = float(row.get("combinedVP") or 0.0)
+                v = _float(row[i_value] or 0.0)
             except Exception:
-                vp = 0.0
-            out[w] = vp
+                v = 0.0
+            out[w] = v
     return out
 
 
+def load_combined_vp(path: str) -> Dict[str, float]:
+    """Load CombinedVP.csv (wallet,combinedVP) into dict wallet->combinedVP."""
+    return _load_wallet_float(path, "combinedVP", "columns: wallet,combinedVP")
+
+
 def load_voting_weights(path: str) -> Dict[str, float]:
     """Load OutputWeights.csv (wallet,num_proposals,weight) into dict wallet->weight."""
-    out: Dict[str, float] = {}
-    with open(path, "r", newline="", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        if "wallet" not in (reader.fieldnames or []) or "weight" not in (reader.fieldnames or []):
-            raise ValueError(f"{path} must have columns including: wallet,weight")
-
-        for row in reader:
-            w = normalize_addr(row.get("wallet") or "")
-            if not w:
-                continue
-            try:
-                wt = float(row.get("weight") or 0.0)
-            except Exception:
-                wt = 0.0
-            out[w] = wt
-    return out
+    return _load_wallet_float(path, "weight", "columns including: wallet,weight")
 
 
 def load_rf_rewards(path: str) -> Dict[str, float]:
     """Load OutputRFRewards.csv (wallet,rewardRF) into dict wallet->rewardRF."""
-    out: Dict[str, float] = {}
-    with open(path, "r", newline="", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        if "wallet" not in (reader.fieldnames or []) or "rewardRF" not in (reader.fieldnames or []):
-            raise ValueError(f"{path} must have columns: wallet,rewardRF")
-
-        for row in reader:
-            w = normalize_addr(row.get("wallet") or "")
-            if not w:
-                continue
-            try:
-                r = float(row.get("rewardRF") or 0.0)
-            except Exception:
-                r = 0.0
-            out[w] = r
-    return out
+    return _load_wallet_float(path, "rewardRF", "columns: wallet,rewardRF")
 
 
 def union_wallets(*dicts: Dict[str, float]) -> Set[str]:
@@ -195,93 +192,74 @@ def union_wallets(*dicts: Dict[str, float]) -> Set[str]:
 # Core computation
 # ---------------------------------------------------------------------------
 
-def main():
-    if len(sys.argv) != 7:
-        print(
-            "Usage:\n"
-            "  python GetTotalDistributionAmounts.py "
-            "CombinedVP.csv OutputWeights.csv OutputRFRewards.csv "
-            "RewardAmountVP RewardAmountVotingWeightedVP TotalDistributionAmounts.csv",
-            file=sys.stderr,
-        )
-        sys.exit(1)
-
-    combined_vp_path = sys.argv[1]
-    outputweights_path = sys.argv[2]
-    rf_rewards_path = sys.argv[3]
-    reward_amount_vp_raw = sys.argv[4]
-    reward_amount_weighted_vp_raw = sys.argv[5]
-    out_path = sys.argv[6]
-
-    try:
-        reward_amount_vp = float(reward_amount_vp_raw)
-        reward_amount_weighted_vp = float(reward_amount_weighted_vp_raw)
-    except Exception:
-        raise ValueError("RewardAmountVP and RewardAmountVotingWeightedVP must be floats.")
-
-    if reward_amount_vp < 0 or reward_amount_weighted_vp < 0:
-        raise ValueError("Reward amounts must be >= 0.")
-
+def run(
+    combined_vp_path: str,
+    outputweights_path: str,
+    reward_rf: Dict[str, float],
+    reward_amount_vp: float,
+    reward_amount_weighted_vp: float,
+    out_path: str,
+) -> None:
+    """
+    Compute and write TotalDistributionAmounts.csv, printing diagnostics to stderr.
+
+    reward_rf is wallet -> rewardRF as loaded by load_rf_rewards, or as returned
+    in-process by RF/CalculateRFRewards.run (same values, no CSV round trip).
+    """
     # Load inputs
     combined_vp = load_combined_vp(combined_vp_path)
     voting_weight = load_voting_weights(outputweights_path)
-    reward_rf = load_rf_rewards(rf_rewards_path)
 
-    wallets = union_wallets({k: 0.0 for k in combined_vp.keys()},
-                            {k: 0.0 for k in voting_weight.keys()},
-                            {k: 0.0 for k in reward_rf.keys()})
+    # Sorted so every column below has a fixed, reproducible order (and so the
+    # float sums do not depend on set iteration order).
+    wallets: List[str] = sorted(union_wallets(combined_vp, voting_weight, reward_rf))
+
+    # Column-wise view of the outer join on wallet: index i in every list below
+    # refers to wallets[i]; missing values are 0.0.
+    combined_vp_col = [combined_vp.get(w, 0.0) for w in wallets]
+    voting_weight_col = [voting_weight.get(w, 0.0) for w in wallets]
+    reward_rf_col = [reward_rf.get(w, 0.0) for w in wallets]
 
     # Step 1: normalize combinedVP
-    total_vp = sum(max(0.0, v) for v in combined_vp.values())
-    vp_weight: Dict[str, float] = {}
-    if total_vp > 0:
-        for w in wallets:
-            vp = max(0.0, combined_vp.get(w, 0.0))
-            vp_weight[w] = vp / total_vp
-    else:
-        for w in wallets:
-            vp_weight[w] = 0.0
-
-    # Step 2: rewardVP
-    reward_vp: Dict[str, float] = {w: reward_amount_vp * vp_weight[w] for w in wallets}
-
-    # Step 3: voting-weighted VP + renormalize
-    raw_weighted: Dict[str, float] = {}
-    for w in wallets:
-        raw_weighted[w] = vp_weight[w] * max(0.0, voting_weight.get(w, 0.0))
-
-    raw_sum = sum(raw_weighted.values())
-    voting_weighted_norm: Dict[str, float] = {}
-    if raw_sum > 0:
-        for w in wallets:
-            voting_weighted_norm[w] = raw_weighted[w] / raw_sum
-    else:
-        for w in wallets:
-            voting_weighted_norm[w] = 0.0
-
-    # Step 4: rewardWeightedVP
-    reward_weighted_vp: Dict[str, float] = {w: reward_amount_weighted_vp * voting_weighted_norm[w] for w in wallets}
-
-    # Step 5: rewardTotal
-    reward_total: Dict[str, float] = {}
-    for w in wallets:
-        rf = reward_rf.get(w, 0.0)
-        reward_total[w] = rf + reward_vp[w] + reward_weighted_vp[w]
+    # If a total is 0, every term in it is 0, so dividing by 1.0 instead yields
+    # the documented all-zero weights without a separate branch.
+    # Non-positive values are clipped to 0.0, i.e. simply left out of the sum
+    # (summed in file order as before, so the total is bit-for-bit unchanged).
+    total_vp = sum(v for v in combined_vp.values() if v > 0.0)
+    vp_div = total_vp if total_vp > 0 else 1.0
+    vp_weight = [vp / vp_div if vp > 0.0 else 0.0 for vp in combined_vp_col]
+
+    # Step 3 (sum part): voting-weighted VP, needed for the renormalization
+    raw_weighted = [x * max(0.0, vw) for x, vw in zip(vp_weight, voting_weight_col)]
+    raw_sum = sum(raw_weighted)
+    raw_div = raw_sum if raw_sum > 0 else 1.0
+
+    # Steps 2, 3 (renormalize), 4 and 5 fused into a single pass per wallet
+    reward_vp: List[float] = []
+    reward_weighted_vp: List[float] = []
+    reward_total: List[float] = []
+    for x, raw, rf in zip(vp_weight, raw_weighted, reward_rf_col):
+        rvp = reward_amount_vp * x
+        rwv = reward_amount_weighted_vp * (raw / raw_div)
+        reward_vp.append(rvp)
+        reward_weighted_vp.append(rwv)
+        reward_total.append(rf + rvp + rwv)
 
     # Step 6: write output sorted by rewardTotal desc
-    rows = []
-    for w in wallets:
-        rows.append((
-            w,
-            combined_vp.get(w, 0.0),
-            voting_weight.get(w, 0.0),   # votingPercentage (original unaltered "weight")
-            reward_vp[w],
-            reward_weighted_vp[w],
-            reward_rf.get(w, 0.0),
-            reward_total[w],
-        ))
-
-    rows.sort(key=lambda x: (-x[6], x[0]))
+    # votingPercentage is the original unaltered "weight".
+    rows = list(zip(
+        wallets,
+        combined_vp_col,
+        voting_weight_col,
+        reward_vp,
+        reward_weighted_vp,
+        reward_rf_col,
+        reward_total,
+    ))
+
+    # rows are already in wallet order and list.sort is stable, so a single
+    # descending sort on rewardTotal keeps the (-rewardTotal, wallet) order.
+    rows.sort(key=itemgetter(6), reverse=True)
 
     with open(out_path, "w", newline="", encoding="utf-8") as f:
         writer = csv.writer(f)
@@ -294,28 +272,59 @@ def main():
             "rewardRF",
             "rewardTotal",
         ])
-        for (w, vp, vpct, rvp, rweighted, rrf, rtot) in rows:
-            writer.writerow([
-                w,
-                f"{vp:.10f}",
-                f"{vpct:.10f}",
-                f"{rvp:.10f}",
-                f"{rweighted:.10f}",
-                f"{rrf:.10f}",
-                f"{rtot:.10f}",
-            ])
+        writer.writerows(
+            (w, f"{vp:.10f}", f"{vpct:.10f}", f"{rvp:.10f}", f"{rweighted:.10f}", f"{rrf:.10f}", f"{rtot:.10f}")
+            for (w, vp, vpct, rvp, rweighted, rrf, rtot) in rows
+        )
 
     # Diagnostics to stderr
     print(f"Wallets in output: {len(rows)}", file=sys.stderr)
     print(f"Total combinedVP: {total_vp}", file=sys.stderr)
     print(f"RewardAmountVP: {reward_amount_vp}", file=sys.stderr)
     print(f"RewardAmountVotingWeightedVP: {reward_amount_weighted_vp}", file=sys.stderr)
-    print(f"Sum rewardVP: {sum(reward_vp.values()):.10f}", file=sys.stderr)
-    print(f"Sum rewardWeightedVP: {sum(reward_weighted_vp.values()):.10f}", file=sys.stderr)
-    print(f"Sum rewardRF: {sum(reward_rf.get(w, 0.0) for w in wallets):.10f}", file=sys.stderr)
-    print(f"Sum rewardTotal: {sum(reward_total.values()):.10f}", file=sys.stderr)
+    print(f"Sum rewardVP: {sum(reward_vp):.10f}", file=sys.stderr)
+    print(f"Sum rewardWeightedVP: {sum(reward_weighted_vp):.10f}", file=sys.stderr)
+    print(f"Sum rewardRF: {sum(reward_rf_col):.10f}", file=sys.stderr)
+    print(f"Sum rewardTotal: {sum(reward_total):.10f}", file=sys.stderr)
     print(f"Wrote: {out_path}", file=sys.stderr)
 
 
+def main():
+    if len(sys.argv) != 7:
+        print(
+            "Usage:\n"
+            "  python GetTotalDistributionAmounts.py "
+            "CombinedVP.csv OutputWeights.csv OutputRFRewards.csv "
+            "RewardAmountVP RewardAmountVotingWeightedVP TotalDistributionAmounts.csv",
+            file=sys.stderr,
+        )
+        sys.exit(1)
+
+    combined_vp_path = sys.argv[1]
+    outputweights_path = sys.argv[2]
+    rf_rewards_path = sys.argv[3]
+    reward_amount_vp_raw = sys.argv[4]
+    reward_amount_weighted_vp_raw = sys.argv[5]
+    out_path = sys.argv[6]
+
+    try:
+        reward_amount_vp = float(reward_amount_vp_raw)
+        reward_amount_weighted_vp = float(reward_amount_weighted_vp_raw)
+    except Exception:
+        raise ValueError("RewardAmountVP and RewardAmountVotingWeightedVP must be floats.")
+
+    if reward_amount_vp < 0 or reward_amount_weighted_vp < 0:
+        raise ValueError("Reward amounts must be >= 0.")
+
+    run(
+        combined_vp_path=combined_vp_path,
+        outputweights_path=outputweights_path,
+        reward_rf=load_rf_rewards(rf_rewards_path),
+        reward_amount_vp=reward_amount_vp,
+        reward_amount_weighted_vp=reward_amount_weighted_vp,
+        out_path=out_path,
+    )
+
+
 if __name__ == "__main__":
     main()
@@ -132,19 +132,37 @@ Example:
 """
 
 import csv
+import math
 import sys
-from typing import Dict, Iterable, List, Set, Tuple
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from operator import itemgetter
+from typing import Dict, FrozenSet, List, Set, Tuple
+
+
+# Read buffer for the input CSVs: a few large reads instead of many 8 KiB ones.
+CSV_READ_BUFFER = 1 << 20
+
+# Positions below this are exact as floats, so int(x) == int(float(x)) for them.
+FLOAT_EXACT_INT_LIMIT = 1 << 53
 
 
 # ---------------------------------------------------------------------------
 # Helpers
 # ---------------------------------------------------------------------------
 
+@lru_cache(maxsize=None)
 def normalize_addr(addr: str) -> str:
-    """Strip whitespace and lowercase wallet addresses for consistent matching."""
+    """
+    Strip whitespace and lowercase wallet addresses for consistent matching.
+    Interned, so an owner repeated across leaderboard rows is one shared string,
+    and cached on the raw value, so each distinct address is normalized once
+    (leaderboards have ~12 rows per owner).
+    """
     if not addr:
         return ""
-    return addr.strip().lower()
+    return sys.intern(addr.strip().lower())
 
 
 def parse_percentages(s: str) -> Tuple[float, float, float]:
@@ -186,69 +204,62 @@ def parse_percentages(s: str) -> Tuple[float, float, float]:
     return vals[0], vals[1], vals[2]
 
 
-def load_eligible_wallets(path: str) -> Set[str]:
+def load_eligible_wallets(path: str) -> FrozenSet[str]:
     """
     Load eligible wallets from EligibleWalletsLatest.csv (schema: wallet,num_proposals,weight).
     We only use the 'wallet' column.
 
     Returns:
-      set of normalized wallet addresses
+      frozenset of normalized wallet addresses (read-only; shipped to the
+      leaderboard workers and only used for membership tests)
     """
     eligible: Set[str] = set()
-    with open(path, "r", newline="", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        if "wallet" not in (reader.fieldnames or []):
+    with open(path, "r", newline="", encoding="utf-8", buffering=CSV_READ_BUFFER) as f:
+        reader = csv.reader(f)
+        header = next(reader, [])
+        if "wallet" not in header:
             raise ValueError(f"{path} must have a 'wallet' column.")
+        i_wallet = header.index("wallet")
         for row in reader:
-            w = normalize_addr(row.get("wallet") or "")
+            if len(row) <= i_wallet:
+                continue
+            w = normalize_addr(row[i_wallet])
             if w:
                 eligible.add(w)
-    return eligible
-
-
-def iter_rank_entries(path: str) -> Iterable[Tuple[int, str]]:
-    """
-    Yield (position, originalOwner) from a ranking CSV.
-
-    Required columns:
-      - position
-      - originalOwner
-    """
-    with open(path, "r", newline="", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        cols = set(reader.fieldnames or [])
-        if "position" not in cols or "originalOwner" not in cols:
-            raise ValueError(f"{path} must have columns 'position' and 'originalOwner'.")
-
-        for row in reader:
-            pos_raw = (row.get("position") or "").strip()
-            owner_raw = row.get("originalOwner") or ""
-            owner = normalize_addr(owner_raw)
-
-            if not pos_raw or not owner:
-                continue
-
-            try:
-                pos = int(float(pos_raw))
-            except Exception:
-                continue
-
-            if pos <= 0:
-                continue
-
-            yield pos, owner
+    return frozenset(eligible)
 
 
 # ---------------------------------------------------------------------------
 # Core leaderboard computation
 # ---------------------------------------------------------------------------
 
+# Leaderboard columns copied verbatim (stripped) into the per-entry details.
+DETAIL_PAYLOAD_COLUMNS = (
+    "gotchiID",
+    "name",
+    "withSetsRarityScore",
+    "kinship",
+    "experience",
+    "level",
+)
+
+# Per-entry details CSV schema; entry_details rows are tuples in this order.
+DETAIL_HEADER = [
+    "position",
+    *DETAIL_PAYLOAD_COLUMNS,
+    "originalOwner",
+    "originalWeight",
+    "weightAmongEligible",
+    "reward",
+]
+
+
 def compute_owner_rewards_from_ranking(
     ranking_path: str,
-    eligible_wallets: Set[str],
+    eligible_wallets: FrozenSet[str],
     pool_amount: float,
     exponent: float,
-) -> Tuple[Dict[str, float], List[Dict[str, str]]]:
+) -> Tuple[Dict[str, float], List[Tuple[str, ...]]]:
     """
     Compute per-owner reward allocation for one ranking list AND per-entry details.
 
@@ -263,122 +274,101 @@ def compute_owner_rewards_from_ranking(
     Returns:
       (
         owner_rewards,     # dict owner -> reward_from_this_ranking
-        entry_details      # list of dicts for writing per-entry CSV:
-                           #   {
-                           #       "position",
-                           #       "gotchiID",
-                           #       "name",
-                           #       "withSetsRarityScore",
-                           #       "kinship",
-                           #       "experience",
-                           #       "level",
-                           #       "originalOwner",
-                           #       "originalWeight",
-                           #       "weightAmongEligible",
-                           #       "reward"
-                           #   }
+        entry_details      # list of string tuples for writing per-entry CSV,
+                           # one per eligible entry, in DETAIL_HEADER order:
+                           #   (position, gotchiID, name, withSetsRarityScore,
+                           #    kinship, experience, level, originalOwner,
+                           #    originalWeight, weightAmongEligible, reward)
       )
     """
-    # We need more columns than in iter_rank_entries, so read full rows here.
-    entry_rows: List[Dict[str, str]] = []
-    with open(ranking_path, "r", newline="", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        cols = set(reader.fieldnames or [])
-        required_cols = {
-            "position",
-            "gotchiID",
-            "name",
-            "withSetsRarityScore",
-            "kinship",
-            "experience",
-            "level",
-            "originalOwner",
-        }
-        missing = required_cols - cols
+    # The file is parsed once into parallel columns: positions[i], owners[i],
+    # payloads[i] (the stripped DETAIL_PAYLOAD_COLUMNS) and weights[i] (the
+    # original weight, computed while parsing) describe the same entry.
+    positions: List[int] = []
+    owners: List[str] = []
+    payloads: List[Tuple[str, ...]] = []
+    weights: List[float] = []
+    with open(ranking_path, "r", newline="", encoding="utf-8", buffering=CSV_READ_BUFFER) as f:
+        reader = csv.reader(f)
+        header = next(reader, [])
+        required_cols = {"position", "originalOwner", *DETAIL_PAYLOAD_COLUMNS}
+        missing = required_cols - set(header)
         if missing:
             raise ValueError(
                 f"{ranking_path} is missing required columns: {', '.join(sorted(missing))}"
             )
 
+        i_pos = header.index("position")
+        i_owner = header.index("originalOwner")
+        i_payload = [header.index(c) for c in DETAIL_PAYLOAD_COLUMNS]
+        ncols = len(header)
+        # Bound once for the loop; math.pow(1.0 / pos, e) is bit-identical to
+        # (1.0 / float(pos)) ** e for the positive integer positions kept here.
+        _pow = math.pow
+
         for row in reader:
-            pos_raw = (row.get("position") or "").strip()
-            owner_raw = row.get("originalOwner") or ""
-            owner = normalize_addr(owner_raw)
+            if len(row) < ncols:
+                row += [""] * (ncols - len(row))
+            # Filter to eligible owners first: it is the cheapest test and drops
+            # most rows ("" is never eligible, so empty owners go too).
+            owner = normalize_addr(row[i_owner])
+            if owner not in eligible_wallets:
+                continue
 
-            if not pos_raw or not owner:
+            pos_raw = row[i_pos].strip()
+            if not pos_raw:
                 continue
 
+            # Positions are plain integers; take the int() fast path and only go
+            # through int(float()) for "3.0"-style values and for huge ones, so
+            # those round, or overflow and get skipped, as they always did.
             try:
-                pos = int(float(pos_raw))
-            except Exception:
-                continue
+                pos = int(pos_raw)
+            except ValueError:
+                pos = FLOAT_EXACT_INT_LIMIT
+            if pos >= FLOAT_EXACT_INT_LIMIT:
+                try:
+                    pos = int(float(pos_raw))
+                except Exception:
+                    continue
 
             if pos <= 0:
                 continue
 
-            # Filter to eligible owners.
-            if owner not in eligible_wallets:
-                continue
+            positions.append(pos)
+            owners.append(owner)
+            payloads.append(tuple([row[i].strip() for i in i_payload]))
+            weights.append(_pow(1.0 / pos, exponent))
 
-            # Keep row plus parsed position and normalized owner.
-            entry_rows.append(
-                {
-                    "position": str(pos),
-                    "gotchiID": (row.get("gotchiID") or "").strip(),
-                    "name": (row.get("name") or "").strip(),
-                    "withSetsRarityScore": (row.get("withSetsRarityScore") or "").strip(),
-                    "kinship": (row.get("kinship") or "").strip(),
-                    "experience": (row.get("experience") or "").strip(),
-                    "level": (row.get("level") or "").strip(),
-                    "originalOwner": owner,
-                }
-            )
+    owner_rewards: Dict[str, float] = defaultdict(float)
+    entry_details: List[Tuple[str, ...]] = []
 
-    owner_rewards: Dict[str, float] = {}
-    entry_details: List[Dict[str, str]] = []
-
-    if not entry_rows or pool_amount <= 0:
+    if not positions or pool_amount <= 0:
         # No eligible entries or no pool; all rewards remain zero.
         return owner_rewards, entry_details
 
-    # Compute original weights
-    for e in entry_rows:
-        pos = int(e["position"])
-        w = (1.0 / float(pos)) ** exponent
-        e["originalWeight"] = w
-
-    total_w = sum(float(e["originalWeight"]) for e in entry_rows)
+    total_w = sum(weights)
     if total_w <= 0:
         # Degenerate case: no positive weights.
         return owner_rewards, entry_details
 
     # Normalize and compute per-entry rewards; aggregate per-owner.
-    for e in entry_rows:
-        w_orig = float(e["originalWeight"])
+    for pos, owner, payload, w_orig in zip(positions, owners, payloads, weights):
         w_norm = w_orig / total_w
         reward = w_norm * pool_amount
 
-        e["weightAmongEligible"] = w_norm
-        e["reward"] = reward
+        owner_rewards[owner] += reward
 
-        owner = e["originalOwner"]
-        owner_rewards[owner] = owner_rewards.get(owner, 0.0) + reward
-
-        # Prepare a stringified copy for CSV output.
+        # Stringified row for CSV output.
         entry_details.append(
-            {
-                "position": e["position"],
-                "gotchiID": e["gotchiID"],
-                "name": e["name"],
-                "withSetsRarityScore": e["withSetsRarityScore"],
-                "kinship": e["kinship"],
-                "experience": e["experience"],
-                "level": e["level"],
-                "originalOwner": owner,
-                "originalWeight": f"{w_orig:.12f}",
-                "weightAmongEligible": f"{w_norm:.12f}",
-                "reward": f"{reward:.12f}",
-            }
+            (
+                str(pos),
+                *payload,
+                owner,
+                f"{w_orig:.12f}",
+                f"{w_norm:.12f}",
+                f"{reward:.12f}",
+            )
         )
 
     return owner_rewards, entry_details
@@ -386,7 +376,7 @@ def compute_owner_rewards_from_ranking(
 
 def write_rewards_output(
     output_path: str,
-    eligible_wallets: Set[str],
+    eligible_wallets: FrozenSet[str],
     total_rewards: Dict[str, float],
 ) -> None:
     """
@@ -396,80 +386,62 @@ def write_rewards_output(
     Includes ALL eligible wallets, even if reward=0.
     Sorted by reward desc then wallet asc for determinism.
     """
-    rows: List[Tuple[str, float]] = []
-    for w in eligible_wallets:
-        rows.append((w, float(total_rewards.get(w, 0.0))))
+    reward_of = total_rewards.get
+    rows: List[Tuple[str, float]] = [(w, reward_of(w, 0.0)) for w in sorted(eligible_wallets)]
 
-    rows.sort(key=lambda x: (-x[1], x[0]))
+    # Stable sort over wallet-ordered rows == ordering by (-reward, wallet).
+    rows.sort(key=itemgetter(1), reverse=True)
 
     with open(output_path, "w", newline="", encoding="utf-8") as f:
         writer = csv.writer(f)
         writer.writerow(["wallet", "rewardRF"])
-        for w, r in rows:
-            writer.writerow([w, f"{r:.10f}"])
+        writer.writerows((w, f"{r:.10f}") for w, r in rows)
 
 
 def write_leaderboard_rewards_details(
     output_path: str,
-    entry_details: List[Dict[str, str]],
+    entry_details: List[Tuple[str, ...]],
 ) -> None:
     """
-    Write per-entry leaderboard rewards CSV with schema:
+    Write per-entry leaderboard rewards CSV with schema (DETAIL_HEADER):
 
         position,gotchiID,name,withSetsRarityScore,kinship,experience,level,
         originalOwner,originalWeight,weightAmongEligible,reward
 
     Only entries with eligible owners (already filtered upstream) are included.
     """
-    header = [
-        "position",
-        "gotchiID",
-        "name",
-        "withSetsRarityScore",
-        "kinship",
-        "experience",
-        "level",
-        "originalOwner",
-        "originalWeight",
-        "weightAmongEligible",
-        "reward",
-    ]
-
     with open(output_path, "w", newline="", encoding="utf-8") as f:
-        writer = csv.DictWriter(f, fieldnames=header)
-        writer.writeheader()
-        for e in entry_details:
-            writer.writerow(e)
+        writer = csv.writer(f)
+        writer.writerow(DETAIL_HEADER)
+        writer.writerows(entry_details)
 
 
 # ---------------------------------------------------------------------------
 # Main
 # ---------------------------------------------------------------------------
 
-def main():
-    if len(sys.argv) != 11:
-        print(
-            "Usage:\n"
-            "  python CalculateRFRewards.py "
-            "EligibleWalletsLatest.csv BRSRanking.csv KINRankings.csv XPRankings.csv RewardAmount RewardPercentages OutputRewards.csv BRSRewardDetails.csv KINRewardDetails.csv XPRewardDetails.csv\n\n"
-            "RewardPercentages examples: \"50,30,20\" or \"0.5,0.3,0.2\"",
-            file=sys.stderr,
-        )
-        sys.exit(1)
-
-    eligible_wallets_path = sys.argv[1]
-    brs_path = sys.argv[2]
-    kin_path = sys.argv[3]
-    xp_path = sys.argv[4]
-    reward_amount_raw = sys.argv[5]
-    reward_percentages_raw = sys.argv[6]
-    output_path = sys.argv[7]
-
-    # Fixed filenames for per-entry leaderboard rewards.
-    brs_rewards_csv_path = sys.argv[8]
-    kin_rewards_csv_path = sys.argv[9]
-    xp_rewards_csv_path = sys.argv[10]
+def run(
+    eligible_wallets_path: str,
+    brs_path: str,
+    kin_path: str,
+    xp_path: str,
+    reward_amount_raw: str,
+    reward_percentages_raw: str,
+    output_path: str,
+    brs_rewards_csv_path: str,
+    kin_rewards_csv_path: str,
+    xp_rewards_csv_path: str,
+) -> Dict[str, float]:
+    """
+    Run the whole RF step: read the inputs, write the per-wallet output and the
+    three per-entry CSVs, and print diagnostics to stderr.
 
+    Returns:
+      dict wallet -> rewardRF for every eligible wallet, with each value exactly
+      as read back from output_path (rounded to the 10 written decimals), so an
+      in-process caller sees the same numbers as the next script in the
+      pipeline would.
+    """
     eligible_wallets = load_eligible_wallets(eligible_wallets_path)
     if not eligible_wallets:
         print("No eligible wallets found in EligibleWalletsLatest.csv; output will be empty rewards.", file=sys.stderr)
@@ -489,30 +461,39 @@ def main():
     xp_pool = reward_amount * xp_frac
 
     # Compute per-owner rewards and per-entry details for each ranking.
-    brs_rewards, brs_entries = compute_owner_rewards_from_ranking(
-        ranking_path=brs_path,
-        eligible_wallets=eligible_wallets,
-        pool_amount=brs_pool,
-        exponent=0.94,
-    )
-    kin_rewards, kin_entries = compute_owner_rewards_from_ranking(
-        ranking_path=kin_path,
-        eligible_wallets=eligible_wallets,
-        pool_amount=kin_pool,
-        exponent=0.76,
-    )
-    xp_rewards, xp_entries = compute_owner_rewards_from_ranking(
-        ranking_path=xp_path,
-        eligible_wallets=eligible_wallets,
-        pool_amount=xp_pool,
-        exponent=0.65,
-    )
+    # The three rankings are independent (own file, pool and exponent), so they
+    # run in separate worker processes.
+    with ProcessPoolExecutor(max_workers=3) as executor:
+        brs_future = executor.submit(
+            compute_owner_rewards_from_ranking,
+            ranking_path=brs_path,
+            eligible_wallets=eligible_wallets,
+            pool_amount=brs_pool,
+            exponent=0.94,
+        )
+        kin_future = executor.submit(
+            compute_owner_rewards_from_ranking,
+            ranking_path=kin_path,
+            eligible_wallets=eligible_wallets,
+            pool_amount=kin_pool,
+            exponent=0.76,
+        )
+        xp_future = executor.submit(
+            compute_owner_rewards_from_ranking,
+            ranking_path=xp_path,
+            eligible_wallets=eligible_wallets,
+            pool_amount=xp_pool,
+            exponent=0.65,
+        )
+        brs_rewards, brs_entries = brs_future.result()
+        kin_rewards, kin_entries = kin_future.result()
+        xp_rewards, xp_entries = xp_future.result()
 
     # Combine rewards
-    total_rewards: Dict[str, float] = {}
+    total_rewards: Dict[str, float] = defaultdict(float)
     for d in (brs_rewards, kin_rewards, xp_rewards):
         for owner, amt in d.items():
-            total_rewards[owner] = total_rewards.get(owner, 0.0) + float(amt)
+            total_rewards[owner] += amt
 
     # Write per-wallet output
     write_rewards_output(output_path, eligible_wallets, total_rewards)
@@ -523,7 +504,8 @@ def main():
     write_leaderboard_rewards_details(xp_rewards_csv_path, xp_entries)
 
     # Optional diagnostics to stderr
-    total_out = sum(total_rewards.get(w, 0.0) for w in eligible_wallets)
+    reward_of = total_rewards.get
+    total_out = sum(reward_of(w, 0.0) for w in eligible_wallets)
     print(f"Eligible wallets: {len(eligible_wallets)}", file=sys.stderr)
     print(f"RewardAmount: {reward_amount}", file=sys.stderr)
     print(f"Pools -> BRS: {brs_pool}, KIN: {kin_pool}, XP: {xp_pool}", file=sys.stderr)
@@ -533,6 +515,33 @@ def main():
     print(f"Wrote KIN per-entry rewards: {kin_rewards_csv_path}", file=sys.stderr)
     print(f"Wrote XP per-entry rewards: {xp_rewards_csv_path}", file=sys.stderr)
 
+    return {w: float(f"{reward_of(w, 0.0):.10f}") for w in eligible_wallets}
+
+
+def main():
+    if len(sys.argv) != 11:
+        print(
+            "Usage:\n"
+            "  python CalculateRFRewards.py "
+            "EligibleWalletsLatest.csv BRSRanking.csv KINRankings.csv XPRankings.csv RewardAmount RewardPercentages OutputRewards.csv BRSRewardDetails.csv KINRewardDetails.csv XPRewardDetails.csv\n\n"
+            "RewardPercentages examples: \"50,30,20\" or \"0.5,0.3,0.2\"",
+            file=sys.stderr,
+        )
+        sys.exit(1)
+
+    run(
+        eligible_wallets_path=sys.argv[1],
+        brs_path=sys.argv[2],
+        kin_path=sys.argv[3],
+        xp_path=sys.argv[4],
+        reward_amount_raw=sys.argv[5],
+        reward_percentages_raw=sys.argv[6],
+        output_path=sys.argv[7],
+        brs_rewards_csv_path=sys.argv[8],
+        kin_rewards_csv_path=sys.argv[9],
+        xp_rewards_csv_path=sys.argv[10],
+    )
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+RunRewardsPipeline.py
+
+Runs steps 4 and 5 of the README (RF/CalculateRFRewards.py, then
+GetTotalDistributionAmounts.py) in a single process.
+
+Every CSV the two scripts write separately is still written here, byte for
+byte the same. The only difference is that the RF rewards are handed to the
+totals step in memory, so OutputRFRewards.csv is not parsed again. The values
+handed over are already rounded to the 10 decimals written to that file, which
+keeps TotalDistributionAmounts.csv identical to running the scripts one after
+the other.
+
+Usage
+=====
+    python RunRewardsPipeline.py \
+        EligibleWalletsLatest.csv \
+        BRSRanking.csv KINRankings.csv XPRankings.csv \
+        RewardAmountRF RewardPercentages \
+        OutputRFRewards.csv BRSRewardDetails.csv KINRewardDetails.csv XPRewardDetails.csv \
+        CombinedVP.csv OutputWeights.csv \
+        RewardAmountVP RewardAmountVotingWeightedVP \
+        TotalDistributionAmounts.csv
+
+The arguments are those of CalculateRFRewards.py followed by those of
+GetTotalDistributionAmounts.py, minus its OutputRFRewards.csv input.
+"""
+
+import sys
+
+import GetTotalDistributionAmounts
+from RF import CalculateRFRewards
+
+
+def main():
+    if len(sys.argv) != 16:
+        print(
+            "Usage:\n"
+            "  python RunRewardsPipeline.py "
+            "EligibleWalletsLatest.csv BRSRanking.csv KINRankings.csv XPRankings.csv RewardAmountRF RewardPercentages "
+            "OutputRFRewards.csv BRSRewardDetails.csv KINRewardDetails.csv XPRewardDetails.csv "
+            "CombinedVP.csv OutputWeights.csv RewardAmountVP RewardAmountVotingWeightedVP TotalDistributionAmounts.csv",
+            file=sys.stderr,
+        )
+        sys.exit(1)
+
+    try:
+        reward_amount_vp = float(sys.argv[13])
+        reward_amount_weighted_vp = float(sys.argv[14])
+    except Exception:
+        raise ValueError("RewardAmountVP and RewardAmountVotingWeightedVP must be floats.")
+
+    if reward_amount_vp < 0 or reward_amount_weighted_vp < 0:
+        raise ValueError("Reward amounts must be >= 0.")
+
+    reward_rf = CalculateRFRewards.run(
+        eligible_wallets_path=sys.argv[1],
+        brs_path=sys.argv[2],
+        kin_path=sys.argv[3],
+        xp_path=sys.argv[4],
+        reward_amount_raw=sys.argv[5],
+        reward_percentages_raw=sys.argv[6],
+        output_path=sys.argv[7],
+        brs_rewards_csv_path=sys.argv[8],
+        kin_rewards_csv_path=sys.argv[9],
+        xp_rewards_csv_path=sys.argv[10],
+    )
+
+    GetTotalDistributionAmounts.run(
+        combined_vp_path=sys.argv[11],
+        outputweights_path=sys.argv[12],
+        reward_rf=reward_rf,
+        reward_amount_vp=reward_amount_vp,
+        reward_amount_weighted_vp=reward_amount_weighted_vp,
+        out_path=sys.argv[15],
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -129,7 +129,23 @@ Behavior summary
 
 Rate limiting
 =============
-This script sleeps at least 1s before each Snapshot GraphQL request attempt (plus backoff on retries).
+Snapshot GraphQL requests start at least 1s apart across the whole script (plus backoff on
+retries). Votes are queried for PROPOSALS_PER_REQUEST proposals at a time (`proposal_in`), and up
+to FETCH_WORKERS such batches are fetched concurrently, so the time spent waiting on responses
+overlaps instead of adding up; each proposal is fetched only once even if it is both a counted
+decision and an AGIP6M proposal.
+
+Voter cache
+===========
+Votes on closed proposals no longer change, so each proposal's voters are stored in
+VOTER_CACHE_DIR (`.snapshot_cache/<proposal_id>.json`, relative to the working directory) the
+first time they are fetched. Before fetching, the state of every uncached proposal is read from
+Snapshot (one id_in query per PROPOSAL_STATES_PAGE_SIZE IDs); only proposals that are already
+closed are written to the cache, so a proposal listed before it concluded is refetched on every
+run until it closes. Later runs read cached proposals from disk and only hit Snapshot for the
+rest. Entries are `{"state": "closed", "voters": [...]}`, the same format CalculateVotingWeights
+reads and writes; any other content counts as not cached. Delete the directory to force a full
+refetch.
 
 Usage
 =====
@@ -139,10 +155,16 @@ Usage
 """
 
 import csv
+import json
+import os
+import random
 import sys
+import threading
 import time
-from dataclasses import dataclass
-from typing import Any, Dict, Iterable, List, Set, Tuple
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from operator import itemgetter
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
 
 import requests
 
@@ -153,7 +175,18 @@ SNAPSHOT_GRAPHQL = "https://hub.snapshot.org/graphql"
 VOTES_PAGE_SIZE = 1000
 RETRY_MAX = 5
 RETRY_BACKOFF = 1.6  # exponential backoff factor for retries
+RETRY_BACKOFF_MAX = 30.0  # cap (seconds) on a single backoff, before jitter
 TIMEOUT = 30  # seconds
+MIN_REQUEST_INTERVAL = 1.0  # seconds between the starts of any two requests
+FETCH_WORKERS = 8  # proposal batches fetched concurrently
+PROPOSALS_PER_REQUEST = 10  # proposals per votes query (proposal_in)
+PROPOSAL_STATES_PAGE_SIZE = 1000  # proposal IDs per state query (id_in)
+
+# Per-proposal voter cache (concluded proposals only; see module docstring)
+VOTER_CACHE_DIR = ".snapshot_cache"
+
+# Line terminator csv.writer uses by default; output files keep it.
+CSV_LINE_END = "\r\n"
 
 
 # ---------------------------------------------------------------------------
@@ -166,6 +199,9 @@ def normalize_addr(addr: str) -> str:
         - strip surrounding whitespace
         - lowercase
 
+    The result is interned: a wallet that voted on many proposals is one
+    shared string (with its hash computed once) across all voter sets.
+
     This must be used consistently for:
         - addresses from votes (Snapshot API)
         - addresses from WalletAliases.csv
@@ -173,32 +209,14 @@ def normalize_addr(addr: str) -> str:
     """
     if not addr:
         return ""
-    return addr.strip().lower()
-
-
-# ---------------------------------------------------------------------------
-# Data structures
-# ---------------------------------------------------------------------------
-
-@dataclass
-class Proposal:
-    class Proposal:
-        """
-        Simple container for a proposal from the CSV.
-
-        Attributes
-        ----------
-        id : str
-            Snapshot proposal ID (0x...).
-        """
-    id: str
+    return sys.intern(addr.strip().lower())
 
 
 # ---------------------------------------------------------------------------
 # Loading CSV data
 # ---------------------------------------------------------------------------
 
-def load_proposals_from_csv(path: str) -> List[Proposal]:
+def load_proposals_from_csv(path: str) -> List[str]:
     """
     Load proposals from a CSV with columns at least:
         id,title,author,date_utc,num_wallets
@@ -212,9 +230,10 @@ def load_proposals_from_csv(path: str) -> List[Proposal]:
 
     Returns
     -------
-    List[Proposal]
+    List[str]
+        Snapshot proposal IDs (0x...), in file order.
     """
-    proposals: List[Proposal] = []
+    proposals: List[str] = []
     with open(path, "r", newline="", encoding="utf-8") as f:
         reader = csv.DictReader(f)
         if "id" not in (reader.fieldnames or []):
@@ -222,7 +241,7 @@ def load_proposals_from_csv(path: str) -> List[Proposal]:
         for row in reader:
             pid = (row.get("id") or "").strip()
             if pid:
-                proposals.append(Proposal(id=pid))
+                proposals.append(pid)
     return proposals
 
 
@@ -263,9 +282,9 @@ def load_av_to_gvs(path: str) -> Dict[str, List[str]]:
 
 
 def build_decision_groups(
-    included_proposals: List[Proposal],
+    included_proposals: List[str],
     av_to_gvs: Dict[str, List[str]],
-) -> Dict[str, List[Proposal]]:
+) -> Dict[str, List[str]]:
     """
     Build groups of proposals that belong to the same *main-dao decision*.
 
@@ -284,29 +303,25 @@ def build_decision_groups(
         GV2AV: (gv_id="0xGVX", av_id="0xAV1")
 
         decision_groups:
-            "0xAV1" -> [Proposal("0xAV1"), Proposal("0xGVX")]
-            "0xAV2" -> [Proposal("0xAV2")]
+            "0xAV1" -> ["0xAV1", "0xGVX"]
+            "0xAV2" -> ["0xAV2"]
 
     Parameters
     ----------
-    included_proposals : List[Proposal]
-        Proposals from IncludedProposals.csv (main-dao only).
+    included_proposals : List[str]
+        Proposal IDs from IncludedProposals.csv (main-dao only).
     av_to_gvs : Dict[str, List[str]]
         Mapping from av_id -> list of mirrored gv_ids.
 
     Returns
     -------
-    Dict[str, List[Proposal]]
+    Dict[str, List[str]]
         Mapping:
-            decision_id (av_id) -> list of Proposal objects (av_id + gv_ids)
-    """
-    groups: Dict[str, List[Proposal]] = {}
-    for p in included_proposals:
-        av_id = p.id
-        group: List[Proposal] = [p]
-        for gv_id in av_to_gvs.get(av_id, []):
-            group.append(Proposal(id=gv_id))
-        groups[av_id] = group
+            decision_id (av_id) -> list of proposal IDs (av_id + gv_ids)
+    """
+    groups: Dict[str, List[str]] = {}
+    for av_id in included_proposals:
+        groups[av_id] = [av_id, *av_to_gvs.get(av_id, ())]
     return groups
 
 
@@ -372,16 +387,43 @@ def load_alias_map(path: str) -> Tuple[Dict[str, str], Set[str], Set[str]]:
 # Snapshot GraphQL utility
 # ---------------------------------------------------------------------------
 
+class RateLimiter:
+    """
+    Thread-safe limiter that spaces calls to `wait()` at least `interval`
+    seconds apart, no matter which thread makes them.
+
+    Each caller reserves the next free start slot under a lock and then sleeps
+    (outside the lock) until that slot is reached.
+    """
+
+    def __init__(self, interval: float) -> None:
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._next_start = 0.0
+
+    def wait(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_start)
+            self._next_start = start + self.interval
+        if start > now:
+            time.sleep(start - now)
+
+
+# Shared by every thread, so concurrency never raises the request rate.
+_rate_limiter = RateLimiter(MIN_REQUEST_INTERVAL)
+
+
 def gql(session: requests.Session, query: str, variables: Dict[str, Any]) -> Dict[str, Any]:
     """
     POST a GraphQL query to Snapshot's hub with simple retry logic.
 
     Behavior
     --------
-    - Waits at least 1 second before each network attempt to avoid hammering
-      the API.
+    - Starts each network attempt at least MIN_REQUEST_INTERVAL after the
+      previous one (from any thread) to avoid hammering the API.
     - Retries up to RETRY_MAX times, with exponential backoff between attempts
-      in case of errors.
+      in case of errors (capped at RETRY_BACKOFF_MAX, with +/-50% jitter).
 
     Parameters
     ----------
@@ -406,7 +448,7 @@ def gql(session: requests.Session, query: str, variables: Dict[str, Any]) -> Dic
     last_exc = None
 
     for attempt in range(1, RETRY_MAX + 1):
-        time.sleep(1.0)  # minimum delay between attempts
+        _rate_limiter.wait()  # minimum delay between attempts
 
         try:
             resp = session.post(SNAPSHOT_GRAPHQL, json=payload, timeout=TIMEOUT)
@@ -419,60 +461,266 @@ def gql(session: requests.Session, query: str, variables: Dict[str, Any]) -> Dic
             last_exc = e
             if attempt == RETRY_MAX:
                 break
-            time.sleep(RETRY_BACKOFF ** (attempt - 1))
+            # Capped, jittered backoff so that worker threads failing together
+            # do not all retry at the same moment.
+            time.sleep(min(RETRY_BACKOFF_MAX, RETRY_BACKOFF ** (attempt - 1)) * random.uniform(0.5, 1.5))
 
     raise RuntimeError(f"Request failed after {RETRY_MAX} attempts: {last_exc}")
 
 
-def iter_votes_for_proposal(session: requests.Session, proposal_id: str) -> Iterable[str]:
+def iter_votes_for_proposals(session: requests.Session, proposal_ids: List[str]) -> Iterable[Tuple[str, str]]:
     """
-    Yield *normalized* voter addresses for all votes on a given proposal,
-    handling pagination.
+    Yield (proposal_id, *normalized* voter address) for all votes on the given
+    proposals, handling pagination.
 
-    We only fetch and return the 'voter' field, normalized via normalize_addr().
-    The consumer is responsible for counting / deduplicating as needed.
+    All proposals are requested together (`proposal_in`), so a batch of small
+    proposals costs one paginated stream instead of one per proposal. Each
+    vote is tagged with its proposal, and voters are normalized via
+    normalize_addr(). The consumer is responsible for counting /
+    deduplicating as needed.
+
+    Pagination uses the `created` timestamp as a cursor rather than a growing
+    `skip`, because Snapshot caps `skip` (at 5000) and a batch of proposals can
+    have more votes than that. Votes sharing the cursor timestamp that were
+    already returned are skipped with a small `skip`.
 
     Parameters
     ----------
     session : requests.Session
         HTTP session object.
-    proposal_id : str
-        Snapshot proposal ID.
+    proposal_ids : List[str]
+        Snapshot proposal IDs (see PROPOSALS_PER_REQUEST).
 
     Yields
     ------
-    str
-        Normalized wallet address of a voter.
+    Tuple[str, str]
+        (proposal ID, normalized wallet address of a voter).
     """
     query = """
-    query ($proposal: String!, $first: Int!, $skip: Int!) {
+    query ($proposals: [String]!, $created: Int!, $first: Int!, $skip: Int!) {
       votes(
-        where: { proposal: $proposal }
+        where: { proposal_in: $proposals, created_gte: $created }
         first: $first
         skip: $skip
         orderBy: "created"
         orderDirection: asc
       ) {
         voter
+        created
+        proposal {
+          id
+        }
       }
     }
     """
 
+    created = 0
     skip = 0
     while True:
-        data = gql(session, query, {"proposal": proposal_id, "first": VOTES_PAGE_SIZE, "skip": skip})
+        data = gql(
+            session,
+            query,
+            {"proposals": proposal_ids, "created": created, "first": VOTES_PAGE_SIZE, "skip": skip},
+        )
         votes = data.get("votes", [])
         if not votes:
             break
 
         for v in votes:
             voter = v.get("voter")
-            if voter:
-                yield normalize_addr(voter)
+            proposal = v.get("proposal") or {}
+            if voter and proposal.get("id"):
+                yield proposal["id"], normalize_addr(voter)
 
         if len(votes) < VOTES_PAGE_SIZE:
             break
-        skip += VOTES_PAGE_SIZE
+
+        # Next page: votes created at or after the last one seen, minus those
+        # at exactly that timestamp which were already returned.
+        last_created = votes[-1]["created"]
+        same_created = 0
+        for v in reversed(votes):
+            if v["created"] != last_created:
+                break
+            same_created += 1
+        if last_created == created:
+            skip += same_created  # the whole page shared one timestamp
+        else:
+            created = last_created
+            skip = same_created
+
+
+def fetch_closed_proposal_ids(session: requests.Session, proposal_ids: List[str]) -> Set[str]:
+    """
+    Return the subset of `proposal_ids` whose Snapshot state is 'closed'.
+
+    Votes on a closed proposal can no longer change, so only those may be
+    written to the voter cache.
+
+    Parameters
+    ----------
+    session : requests.Session
+        HTTP session for the GraphQL requests.
+    proposal_ids : List[str]
+        Snapshot proposal IDs, queried PROPOSAL_STATES_PAGE_SIZE at a time.
+
+    Returns
+    -------
+    Set[str]
+        IDs of the closed proposals.
+    """
+    query = """
+    query ($ids: [String]!, $first: Int!) {
+      proposals(where: { id_in: $ids }, first: $first) {
+        id
+        state
+      }
+    }
+    """
+
+    closed: Set[str] = set()
+    for i in range(0, len(proposal_ids), PROPOSAL_STATES_PAGE_SIZE):
+        ids = proposal_ids[i:i + PROPOSAL_STATES_PAGE_SIZE]
+        data = gql(session, query, {"ids": ids, "first": len(ids)})
+        for p in data.get("proposals") or []:
+            if p.get("state") == "closed" and p.get("id"):
+                closed.add(p["id"])
+    return closed
+
+
+def _voter_cache_path(proposal_id: str) -> str:
+    return os.path.join(VOTER_CACHE_DIR, f"{proposal_id}.json")
+
+
+def load_cached_voters(proposal_id: str) -> Optional[Set[str]]:
+    """
+    Return the cached voter set of a proposal, or None if it is not cached.
+
+    Entries look like {"state": "closed", "voters": [...]}, in the format
+    CalculateVotingWeights also reads and writes. An unreadable file, or any
+    other JSON shape (including untagged voter lists from earlier versions),
+    counts as a miss.
+    """
+    try:
+        with open(_voter_cache_path(proposal_id), "r", encoding="utf-8") as f:
+            entry = json.load(f)
+    except (OSError, ValueError):
+        return None
+    voters = entry.get("voters") if isinstance(entry, dict) and entry.get("state") == "closed" else None
+    if not isinstance(voters, list) or not all(isinstance(v, str) for v in voters):
+        return None
+    return set(map(sys.intern, voters))
+
+
+def store_cached_voters(proposal_id: str, voters: Set[str]) -> None:
+    """
+    Write a closed proposal's voters to the cache, as
+    {"state": "closed", "voters": [sorted voters]}.
+
+    The file is written under a temporary name and moved into place with
+    os.replace(), so an interrupted run never leaves a truncated entry.
+    """
+    os.makedirs(VOTER_CACHE_DIR, exist_ok=True)
+    path = _voter_cache_path(proposal_id)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"state": "closed", "voters": sorted(voters)}, f)
+    os.replace(tmp_path, path)
+
+
+def fetch_voters_for_proposals(
+    session: requests.Session,
+    proposal_ids: Iterable[str],
+) -> Dict[str, Set[str]]:
+    """
+    Fetch the set of (normalized) voters for every given proposal.
+
+    Proposals are fetched in batches of PROPOSALS_PER_REQUEST (one paginated
+    votes query per batch), and batches are fetched concurrently by
+    FETCH_WORKERS threads; each thread uses its own requests.Session (with the
+    headers of `session`), and all of them share the global rate limiter.
+    Duplicate IDs are fetched once, and proposals already in the voter cache
+    are not fetched at all; newly fetched ones are added to it if Snapshot
+    reports them as closed.
+
+    Parameters
+    ----------
+    session : requests.Session
+        Template session; its headers are copied to the worker sessions.
+    proposal_ids : Iterable[str]
+        Snapshot proposal IDs.
+
+    Returns
+    -------
+    Dict[str, Set[str]]
+        proposal_id -> set of voter addresses
+    """
+    voters_by_proposal: Dict[str, Set[str]] = {}
+    missing_ids: List[str] = []
+    for proposal_id in dict.fromkeys(proposal_ids):
+        cached = load_cached_voters(proposal_id)
+        if cached is None:
+            missing_ids.append(proposal_id)
+        else:
+            voters_by_proposal[proposal_id] = cached
+    print(
+        f"Voter cache: {len(voters_by_proposal)} proposals cached, {len(missing_ids)} to fetch",
+        file=sys.stderr,
+    )
+
+    # States are read before the votes: a proposal closing in between is then
+    # only cached on a later run, never cached with votes missing.
+    closed_ids = fetch_closed_proposal_ids(session, missing_ids) if missing_ids else set()
+
+    batches = [
+        missing_ids[i:i + PROPOSALS_PER_REQUEST]
+        for i in range(0, len(missing_ids), PROPOSALS_PER_REQUEST)
+    ]
+    local = threading.local()
+    worker_sessions: List[requests.Session] = []
+    stop_fetching = threading.Event()
+
+    def fetch(batch: List[str]) -> Dict[str, Set[str]]:
+        worker_session = getattr(local, "session", None)
+        if worker_session is None:
+            worker_session = requests.Session()
+            worker_session.headers.update(session.headers)
+            local.session = worker_session
+            worker_sessions.append(worker_session)
+        voters: Dict[str, Set[str]] = {proposal_id: set() for proposal_id in batch}
+        for proposal_id, voter in iter_votes_for_proposals(worker_session, batch):
+            if stop_fetching.is_set():
+                break  # another batch failed; this result is never used
+            voters[proposal_id].add(voter)
+        return voters
+
+    total = len(batches)
+    try:
+        with ThreadPoolExecutor(max_workers=FETCH_WORKERS) as executor:
+            futures = [executor.submit(fetch, batch) for batch in batches]
+            try:
+                for idx, future in enumerate(as_completed(futures), start=1):
+                    voters = future.result()
+                    print(
+                        f"Fetched votes {idx}/{total}: proposals={len(voters)} "
+                        f"voters={sum(len(v) for v in voters.values())}",
+                        file=sys.stderr,
+                    )
+                    for proposal_id, proposal_voters in voters.items():
+                        if proposal_id in closed_ids:
+                            store_cached_voters(proposal_id, proposal_voters)
+                    voters_by_proposal.update(voters)
+            except BaseException:
+                # Fail fast: drop queued batches and stop running ones rather than
+                # waiting for all of them at the shared 1 request/s rate.
+                stop_fetching.set()
+                executor.shutdown(wait=False, cancel_futures=True)
+                raise
+    finally:
+        for worker_session in worker_sessions:
+            worker_session.close()
+
+    return voters_by_proposal
 
 
 # ---------------------------------------------------------------------------
@@ -480,8 +728,8 @@ def iter_votes_for_proposal(session: requests.Session, proposal_id: str) -> Iter
 # ---------------------------------------------------------------------------
 
 def build_decision_counts(
-    session: requests.Session,
-    decision_groups: Dict[str, List[Proposal]],
+    voters_by_proposal: Dict[str, Set[str]],
+    decision_groups: Dict[str, List[str]],
     alias_map: Dict[str, str],
 ) -> Dict[str, int]:
     """
@@ -489,8 +737,9 @@ def build_decision_counts(
     participated in.
 
     For each decision group (identified by its main-dao av_id):
-      - Fetch votes for every proposal in the group (av_id and any gv_ids).
-      - For each raw voter address (already normalized by iter_votes_for_proposal):
+      - Take the voters of every proposal in the group (av_id and any gv_ids).
+      - For each raw voter address (already normalized by iter_votes_for_proposals,
+        via fetch_voters_for_proposals):
             identity = alias_map.get(voter, voter)
         (master if voter is a slave, otherwise voter itself).
       - Collect a set of unique identities that voted on ANY of those proposals.
@@ -504,10 +753,11 @@ def build_decision_counts(
 
     Parameters
     ----------
-    session : requests.Session
-        HTTP session object.
-    decision_groups : Dict[str, List[Proposal]]
-        Mapping from main-dao decision id (av_id) to a list of Proposal objects
+    voters_by_proposal : Dict[str, Set[str]]
+        Voters of every proposal in decision_groups, as returned by
+        fetch_voters_for_proposals().
+    decision_groups : Dict[str, List[str]]
+        Mapping from main-dao decision id (av_id) to a list of proposal IDs
         (including its mirrors).
     alias_map : Dict[str, str]
         Mapping from normalized wallet -> normalized master wallet (identity).
@@ -518,7 +768,7 @@ def build_decision_counts(
     Dict[str, int]
         identity -> decision_count
     """
-    wallet_counts: Dict[str, int] = {}
+    wallet_counts: Counter = Counter()
 
     total = len(decision_groups)
     for idx, (decision_id, proposals) in enumerate(decision_groups.items(), start=1):
@@ -527,22 +777,20 @@ def build_decision_counts(
             file=sys.stderr,
         )
 
-        identities_voted: Set[str] = set()
-
-        for prop in proposals:
-            for voter in iter_votes_for_proposal(session, prop.id):
-                identity = alias_map.get(voter, voter)
-                identities_voted.add(identity)
+        # Voters of any proposal in the group, then slave -> master in one
+        # C-level pass: map() calls alias_map.get(voter, voter) per voter.
+        voters: Set[str] = set().union(*(voters_by_proposal[pid] for pid in proposals))
+        identities_voted: Set[str] = set(map(alias_map.get, voters, voters))
 
-        for identity in identities_voted:
-            wallet_counts[identity] = wallet_counts.get(identity, 0) + 1
+        # +1 for every identity in one C-level update per decision.
+        wallet_counts.update(identities_voted)
 
     return wallet_counts
 
 
 def compute_eligible_wallets_per_wallet(
-    session: requests.Session,
-    agip_proposals: List[Proposal],
+    voters_by_proposal: Dict[str, Set[str]],
+    agip_proposals: List[str],
 ) -> Set[str]:
     """
     Determine which wallets are *eligible* based on AGIP6M.csv.
@@ -560,10 +808,11 @@ def compute_eligible_wallets_per_wallet(
 
     Parameters
     ----------
-    session : requests.Session
-        HTTP session object.
-    agip_proposals : List[Proposal]
-        Proposals loaded from AGIP6M.csv (only their IDs are used).
+    voters_by_proposal : Dict[str, Set[str]]
+        Voters of every AGIP6M proposal, as returned by
+        fetch_voters_for_proposals().
+    agip_proposals : List[str]
+        Proposal IDs loaded from AGIP6M.csv.
 
     Returns
     -------
@@ -573,10 +822,9 @@ def compute_eligible_wallets_per_wallet(
     eligible: Set[str] = set()
 
     total = len(agip_proposals)
-    for idx, prop in enumerate(agip_proposals, start=1):
-        print(f"Eligibility from AGIP6M {idx}/{total}: id={prop.id}", file=sys.stderr)
-        for voter in iter_votes_for_proposal(session, prop.id):
-            eligible.add(voter)
+    for idx, pid in enumerate(agip_proposals, start=1):
+        print(f"Eligibility from AGIP6M {idx}/{total}: id={pid}", file=sys.stderr)
+        eligible.update(voters_by_proposal[pid])
 
     return eligible
 
@@ -598,31 +846,26 @@ def write_vote_counts_csv(path: str, wallet_counts: Dict[str, int], slaves: Set[
     #   - all slave wallets (so they are explicitly present as 0 if desired)
     all_wallets: Set[str] = set(wallet_counts.keys()).union(slaves)
 
-    rows: List[Tuple[str, int]] = []
-    for wallet in all_wallets:
-        if wallet in slaves:
-            n = 0
-        else:
-            n = wallet_counts.get(wallet, 0)
-        rows.append((wallet, n))
-
-    rows.sort(key=lambda x: (-x[1], x[0]))
+    # Rows in wallet order, then a stable sort on the count alone: same order
+    # as sorting by (-num_proposals, wallet), without a per-row key tuple.
+    rows: List[Tuple[str, int]] = [
+        (wallet, 0 if wallet in slaves else wallet_counts.get(wallet, 0))
+        for wallet in sorted(all_wallets)
+    ]
+    rows.sort(key=itemgetter(1), reverse=True)
 
+    # Hex addresses and ints never need quoting, so the file is built as one
+    # string in csv.writer's exact format ("\r\n" line ends) and written once.
     with open(path, "w", newline="", encoding="utf-8") as f:
-        w = csv.writer(f)
-        w.writerow(["wallet", "num_proposals"])
-        for wallet, n in rows:
-            w.writerow([wallet, n])
+        f.write("wallet,num_proposals" + CSV_LINE_END)
+        f.write("".join(f"{wallet},{n}{CSV_LINE_END}" for wallet, n in rows))
 
 
 def write_eligible_wallets_csv(path: str, eligible_wallets: Set[str]) -> None:
     """Write EligibleWalletsCached.csv: single column wallet."""
-    rows = sorted(eligible_wallets)
     with open(path, "w", newline="", encoding="utf-8") as f:
-        w = csv.writer(f)
-        w.writerow(["wallet"])
-        for wallet in rows:
-            w.writerow([wallet])
+        f.write("wallet" + CSV_LINE_END)
+        f.write("".join(wallet + CSV_LINE_END for wallet in sorted(eligible_wallets)))
 
 
 def write_concluded_decision_count(path: str, n: int) -> None:
@@ -681,13 +924,20 @@ def main():
             }
         )
 
-        # 1) Count decisions for ALL identities (no eligibility filtering at all).
-        wallet_counts = build_decision_counts(session, decision_groups, alias_map)
-        print(f"Identities with >=1 counted decision: {len(wallet_counts)}", file=sys.stderr)
+        # 0) Fetch voters once for every proposal needed below (decision groups
+        #    and AGIP6M overlap, since AGIP6M is a subset of IncludedProposals).
+        voters_by_proposal = fetch_voters_for_proposals(
+            session,
+            [pid for group in decision_groups.values() for pid in group] + agip_proposals,
+        )
+
+    # 1) Count decisions for ALL identities (no eligibility filtering at all).
+    wallet_counts = build_decision_counts(voters_by_proposal, decision_groups, alias_map)
+    print(f"Identities with >=1 counted decision: {len(wallet_counts)}", file=sys.stderr)
 
-        # 2) Compute eligible wallets (per-wallet, no aliasing).
-        eligible_wallets = compute_eligible_wallets_per_wallet(session, agip_proposals) if agip_proposals else set()
-        print(f"Eligible wallets (per wallet): {len(eligible_wallets)}", file=sys.stderr)
+    # 2) Compute eligible wallets (per-wallet, no aliasing).
+    eligible_wallets = compute_eligible_wallets_per_wallet(voters_by_proposal, agip_proposals) if agip_proposals else set()
+    print(f"Eligible wallets (per wallet): {len(eligible_wallets)}", file=sys.stderr)
 
     # Outputs
     write_vote_counts_csv(out_vote_counts, wallet_counts, slaves)
@@ -21,6 +21,12 @@ STEP 2 (this script):
       - ConcludedDecisionCount.txt  (# of concluded "countable decisions" used when producing VoteCounts.csv)
 
   - The script fetches votes ONLY for proposals in ActiveProposals.csv and amends counts.
+    (Votes are queried PROPOSALS_PER_REQUEST proposals at a time, up to FETCH_WORKERS batches
+    concurrently; requests still start at least 1s apart, and a proposal in both input lists
+    is fetched once.)
+    Proposals already closed on Snapshot are stored in the voter cache shared with step 1
+    (.snapshot_cache/<proposal_id>.json, tagged with state "closed") and read from it on
+    later runs; still-active proposals are always refetched.
 
   - Eligibility update:
         A wallet is eligible if *that wallet itself* voted on ANY proposal in AGIPActive.csv.
@@ -87,10 +93,17 @@ Usage
 """
 
 import csv
+import json
+import os
+import random
 import sys
+import threading
 import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from dataclasses import dataclass
-from typing import Any, Dict, Iterable, List, Set, Tuple
+from operator import itemgetter
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
 
 import requests
 
@@ -99,7 +112,17 @@ SNAPSHOT_GRAPHQL = "https://hub.snapshot.org/graphql"
 VOTES_PAGE_SIZE = 1000
 RETRY_MAX = 5
 RETRY_BACKOFF = 1.6
+RETRY_BACKOFF_MAX = 30.0
 TIMEOUT = 30
+MIN_REQUEST_INTERVAL = 1.0
+FETCH_WORKERS = 8
+PROPOSALS_PER_REQUEST = 10
+PROPOSAL_STATES_PAGE_SIZE = 1000
+
+# Voter cache shared with CalculateCachedVoteCounts (closed proposals only).
+VOTER_CACHE_DIR = ".snapshot_cache"
+
+CSV_LINE_END = "\r\n"  # csv.writer's default line terminator, kept in output files
 
 
 # ---------------------------------------------------------------------------
@@ -107,10 +130,13 @@ TIMEOUT = 30
 # ---------------------------------------------------------------------------
 
 def normalize_addr(addr: str) -> str:
-    """Strip whitespace and lowercase. Always use this for wallet addresses."""
+    """Strip whitespace and lowercase (interned). Always use this for wallet addresses."""
     if not addr:
         return ""
-    return addr.strip().lower()
+    # VoteCounts.csv and EligibleWalletsCached.csv come lowercase from step 1; skip the copy there.
+    if addr[:2] == "0x" and addr.islower() and not addr[-1].isspace():
+        return sys.intern(addr)
+    return sys.intern(addr.strip().lower())
 
 
 def read_int_file(path: str) -> int:
@@ -163,20 +189,33 @@ def load_vote_counts(path: str) -> Dict[str, int]:
     """
     counts: Dict[str, int] = {}
     with open(path, "r", newline="", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        if not reader.fieldnames:
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if not header:
             raise ValueError(f"{path} has no header.")
-        if "wallet" not in reader.fieldnames or "num_proposals" not in reader.fieldnames:
+        if "wallet" not in header or "num_proposals" not in header:
             raise ValueError(f"{path} must have columns wallet,num_proposals")
 
+        # Plain rows by column index: no per-row dict as with csv.DictReader.
+        wallet_idx = header.index("wallet")
+        num_idx = header.index("num_proposals")
+        width = max(wallet_idx, num_idx) + 1
         for row in reader:
-            w = normalize_addr(row.get("wallet") or "")
+            if not row:
+                continue
+            if len(row) < width:
+                row = row + [""] * (width - len(row))
+            w = normalize_addr(row[wallet_idx])
             if not w:
                 continue
+            raw = row[num_idx]
             try:
-                n = int(float(row.get("num_proposals") or 0))
-            except Exception:
-                n = 0
+                n = int(raw)  # VoteCounts.csv holds plain ints
+            except ValueError:
+                try:
+                    n = int(float(raw or 0))
+                except Exception:
+                    n = 0
             counts[w] = n
     return counts
 
@@ -265,16 +304,37 @@ def load_alias_map(path: str) -> Tuple[Dict[str, str], Set[str]]:
 # Snapshot GraphQL (rate-limited)
 # ---------------------------------------------------------------------------
 
+class RateLimiter:
+    """Thread-safe: spaces wait() calls at least `interval` seconds apart across all threads."""
+
+    def __init__(self, interval: float) -> None:
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._next_start = 0.0
+
+    def wait(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_start)
+            self._next_start = start + self.interval
+        if start > now:
+            time.sleep(start - now)
+
+
+# Shared by every thread, so concurrency never raises the request rate.
+_rate_limiter = RateLimiter(MIN_REQUEST_INTERVAL)
+
+
 def gql(session: requests.Session, query: str, variables: Dict[str, Any]) -> Dict[str, Any]:
     """
     Rate-limited GraphQL POST with retries.
-    Sleeps >= 1s per attempt (and extra backoff on retry).
+    Attempts start >= MIN_REQUEST_INTERVAL apart across threads (plus capped, jittered backoff on retry).
     """
     payload = {"query": query, "variables": variables}
     last_exc = None
 
     for attempt in range(1, RETRY_MAX + 1):
-        time.sleep(1.0)
+        _rate_limiter.wait()
         try:
             resp = session.post(SNAPSHOT_GRAPHQL, json=payload, timeout=TIMEOUT)
             resp.raise_for_status()
@@ -286,42 +346,204 @@ def gql(session: requests.Session, query: str, variables: Dict[str, Any]) -> Dic
             last_exc = e
             if attempt == RETRY_MAX:
                 break
-            time.sleep(RETRY_BACKOFF ** (attempt - 1))
+            # Capped, jittered backoff so that worker threads failing together
+            # do not all retry at the same moment.
+            time.sleep(min(RETRY_BACKOFF_MAX, RETRY_BACKOFF ** (attempt - 1)) * random.uniform(0.5, 1.5))
 
     raise RuntimeError(f"Request failed after {RETRY_MAX} attempts: {last_exc}")
 
 
-def iter_votes_for_proposal(session: requests.Session, proposal_id: str) -> Iterable[str]:
-    """Yield normalized voter addresses for all votes on a proposal (pagination)."""
+def iter_votes_for_proposals(session: requests.Session, proposal_ids: List[str]) -> Iterable[Tuple[str, str]]:
+    """
+    Yield (proposal_id, normalized voter) for all votes on a batch of proposals (proposal_in).
+
+    Pages are walked with a `created` cursor instead of an ever-growing `skip`
+    (Snapshot caps skip at 5000, which a batch can exceed); votes at the cursor
+    timestamp that were already returned are skipped with a small `skip`.
+    """
     query = """
-    query ($proposal: String!, $first: Int!, $skip: Int!) {
+    query ($proposals: [String]!, $created: Int!, $first: Int!, $skip: Int!) {
       votes(
-        where: { proposal: $proposal }
+        where: { proposal_in: $proposals, created_gte: $created }
         first: $first
         skip: $skip
         orderBy: "created"
         orderDirection: asc
       ) {
         voter
+        created
+        proposal {
+          id
+        }
       }
     }
     """
 
+    created = 0
     skip = 0
     while True:
-        data = gql(session, query, {"proposal": proposal_id, "first": VOTES_PAGE_SIZE, "skip": skip})
+        data = gql(
+            session,
+            query,
+            {"proposals": proposal_ids, "created": created, "first": VOTES_PAGE_SIZE, "skip": skip},
+        )
         votes = data.get("votes", [])
         if not votes:
             break
 
         for v in votes:
             voter = v.get("voter")
-            if voter:
-                yield normalize_addr(voter)
+            proposal = v.get("proposal") or {}
+            if voter and proposal.get("id"):
+                yield proposal["id"], normalize_addr(voter)
 
         if len(votes) < VOTES_PAGE_SIZE:
             break
-        skip += VOTES_PAGE_SIZE
+
+        # Next page starts at the last timestamp seen, past the votes already read there.
+        last_created = votes[-1]["created"]
+        same_created = 0
+        for v in reversed(votes):
+            if v["created"] != last_created:
+                break
+            same_created += 1
+        if last_created == created:
+            skip += same_created  # the whole page shared one timestamp
+        else:
+            created = last_created
+            skip = same_created
+
+
+def fetch_closed_proposal_ids(session: requests.Session, proposal_ids: List[str]) -> Set[str]:
+    """Return the subset of proposal_ids whose Snapshot state is 'closed' (votes can no longer change)."""
+    query = """
+    query ($ids: [String]!, $first: Int!) {
+      proposals(where: { id_in: $ids }, first: $first) {
+        id
+        state
+      }
+    }
+    """
+
+    closed: Set[str] = set()
+    for i in range(0, len(proposal_ids), PROPOSAL_STATES_PAGE_SIZE):
+        ids = proposal_ids[i:i + PROPOSAL_STATES_PAGE_SIZE]
+        data = gql(session, query, {"ids": ids, "first": len(ids)})
+        for p in data.get("proposals") or []:
+            if p.get("state") == "closed" and p.get("id"):
+                closed.add(p["id"])
+    return closed
+
+
+def _voter_cache_path(proposal_id: str) -> str:
+    return os.path.join(VOTER_CACHE_DIR, f"{proposal_id}.json")
+
+
+def load_cached_voters(proposal_id: str) -> Optional[Set[str]]:
+    """
+    Cached voter set of a proposal, or None if not cached.
+
+    Entries are {"state": "closed", "voters": [...]}, as both VotingData scripts write them.
+    An unreadable file or any other JSON shape (e.g. untagged lists from earlier versions) is a miss.
+    """
+    try:
+        with open(_voter_cache_path(proposal_id), "r", encoding="utf-8") as f:
+            entry = json.load(f)
+    except (OSError, ValueError):
+        return None
+    voters = entry.get("voters") if isinstance(entry, dict) and entry.get("state") == "closed" else None
+    if not isinstance(voters, list) or not all(isinstance(v, str) for v in voters):
+        return None
+    return set(map(sys.intern, voters))
+
+
+def store_cached_voters(proposal_id: str, voters: Set[str]) -> None:
+    """
+    Write a closed proposal's voters to the cache as {"state": "closed", "voters": [sorted]}.
+    Tmp file + os.replace, so never truncated.
+    """
+    os.makedirs(VOTER_CACHE_DIR, exist_ok=True)
+    path = _voter_cache_path(proposal_id)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"state": "closed", "voters": sorted(voters)}, f)
+    os.replace(tmp_path, path)
+
+
+def fetch_voters_for_proposals(session: requests.Session, proposal_ids: Iterable[str]) -> Dict[str, Set[str]]:
+    """
+    Fetch proposal_id -> set of normalized voters.
+
+    Proposals are queried PROPOSALS_PER_REQUEST at a time, FETCH_WORKERS batches at once.
+    Each worker thread uses its own requests.Session (headers copied from `session`);
+    all share the global rate limiter. Duplicate IDs are fetched once.
+
+    Proposals with a closed-state entry in the voter cache are not fetched. Of the others,
+    those already closed on Snapshot are added to the cache; still-active ones never are.
+    """
+    voters_by_proposal: Dict[str, Set[str]] = {}
+    missing_ids: List[str] = []
+    for proposal_id in dict.fromkeys(proposal_ids):
+        cached = load_cached_voters(proposal_id)
+        if cached is None:
+            missing_ids.append(proposal_id)
+        else:
+            voters_by_proposal[proposal_id] = cached
+    print(
+        f"Voter cache: {len(voters_by_proposal)} proposals cached, {len(missing_ids)} to fetch",
+        file=sys.stderr,
+    )
+
+    # States are read before the votes: a proposal closing in between is then only
+    # cached on a later run, never cached with votes missing.
+    closed_ids = fetch_closed_proposal_ids(session, missing_ids) if missing_ids else set()
+
+    batches = [missing_ids[i:i + PROPOSALS_PER_REQUEST] for i in range(0, len(missing_ids), PROPOSALS_PER_REQUEST)]
+    local = threading.local()
+    worker_sessions: List[requests.Session] = []
+    stop_fetching = threading.Event()
+
+    def fetch(batch: List[str]) -> Dict[str, Set[str]]:
+        worker_session = getattr(local, "session", None)
+        if worker_session is None:
+            worker_session = requests.Session()
+            worker_session.headers.update(session.headers)
+            local.session = worker_session
+            worker_sessions.append(worker_session)
+        voters: Dict[str, Set[str]] = {proposal_id: set() for proposal_id in batch}
+        for proposal_id, voter in iter_votes_for_proposals(worker_session, batch):
+            if stop_fetching.is_set():
+                break  # another batch failed; this result is never used
+            voters[proposal_id].add(voter)
+        return voters
+
+    total = len(batches)
+    try:
+        with ThreadPoolExecutor(max_workers=FETCH_WORKERS) as executor:
+            futures = [executor.submit(fetch, batch) for batch in batches]
+            try:
+                for i, future in enumerate(as_completed(futures), start=1):
+                    voters = future.result()
+                    print(
+                        f"Fetched votes {i}/{total}: {len(voters)} proposals, "
+                        f"{sum(len(v) for v in voters.values())} voters",
+                        file=sys.stderr,
+                    )
+                    for proposal_id, proposal_voters in voters.items():
+                        if proposal_id in closed_ids:
+                            store_cached_voters(proposal_id, proposal_voters)
+                    voters_by_proposal.update(voters)
+            except BaseException:
+                # Fail fast: drop queued batches and stop running ones rather than
+                # waiting for all of them at the shared 1 request/s rate.
+                stop_fetching.set()
+                executor.shutdown(wait=False, cancel_futures=True)
+                raise
+    finally:
+        for worker_session in worker_sessions:
+            worker_session.close()
+
+    return voters_by_proposal
 
 
 # ---------------------------------------------------------------------------
@@ -329,16 +551,18 @@ def iter_votes_for_proposal(session: requests.Session, proposal_id: str) -> Iter
 # ---------------------------------------------------------------------------
 
 def update_counts_with_active_proposals(
-    session: requests.Session,
+    voters_by_proposal: Dict[str, Set[str]],
     active_proposals: List[Proposal],
-    counts_all_wallets: Dict[str, int],
+    counts_all_wallets: Counter,
     alias_map: Dict[str, str],
-) -> Dict[str, int]:
+) -> Counter:
     """
     For each proposal in ActiveProposals.csv:
-      - Fetch voters (raw wallets).
+      - Take its voters (raw wallets) from voters_by_proposal.
       - For counting: map each voter to identity via alias_map and add +1 per identity per proposal.
 
+    counts_all_wallets is a Counter (identity -> count) and is updated in place.
+
     Returns:
       updated counts_all_wallets (identity counts).
     """
@@ -346,22 +570,18 @@ def update_counts_with_active_proposals(
     for i, p in enumerate(active_proposals, start=1):
         print(f"Processing ACTIVE proposal (counting) {i}/{total}: {p.id}", file=sys.stderr)
 
-        voters_raw: Set[str] = set(iter_votes_for_proposal(session, p.id))
+        voters_raw: Set[str] = voters_by_proposal[p.id]
 
         # Merge slaves->master for counting. Ensure at most +1 per identity per proposal.
-        identities: Set[str] = set()
-        for w in voters_raw:
-            identity = alias_map.get(w, w)
-            identities.add(identity)
-
-        for identity in identities:
-            counts_all_wallets[identity] = counts_all_wallets.get(identity, 0) + 1
+        # (map() calls alias_map.get(w, w) for every voter without a Python-level loop.)
+        identities: Set[str] = set(map(alias_map.get, voters_raw, voters_raw))
+        counts_all_wallets.update(identities)
 
     return counts_all_wallets
 
 
 def compute_newly_eligible_from_AGIPActive(
-    session: requests.Session,
+    voters_by_proposal: Dict[str, Set[str]],
     AGIPActive_proposals: List[Proposal],
 ) -> Set[str]:
     """
@@ -379,8 +599,7 @@ def compute_newly_eligible_from_AGIPActive(
     total = len(AGIPActive_proposals)
     for i, p in enumerate(AGIPActive_proposals, start=1):
         print(f"Processing AGIPActive (eligibility) {i}/{total}: {p.id}", file=sys.stderr)
-        for voter in iter_votes_for_proposal(session, p.id):
-            newly_eligible.add(voter)
+        newly_eligible.update(voters_by_proposal[p.id])
 
     return newly_eligible
 
@@ -403,7 +622,7 @@ def write_output_weights(
     """
     rows: List[Tuple[str, int, float]] = []
 
-    for wallet in eligible_wallets:
+    for wallet in sorted(eligible_wallets):
         if wallet in slaves:
             n = 0
             w = 0.0
@@ -412,13 +631,13 @@ def write_output_weights(
             w = (n / total_decisions) if total_decisions > 0 else 0.0
         rows.append((wallet, n, w))
 
-    rows.sort(key=lambda x: (-x[2], x[0]))
+    # Stable sort of wallet-ordered rows on weight alone == sort by (-weight, wallet).
+    rows.sort(key=itemgetter(2), reverse=True)
 
+    # Addresses and numbers never need quoting: build csv.writer's exact output and write it once.
     with open(output_path, "w", newline="", encoding="utf-8") as f:
-        writer = csv.writer(f)
-        writer.writerow(["wallet", "num_proposals", "weight"])
-        for wallet, n, w in rows:
-            writer.writerow([wallet, n, f"{w:.6f}"])
+        f.write("wallet,num_proposals,weight" + CSV_LINE_END)
+        f.write("".join(f"{wallet},{n},{w:.6f}{CSV_LINE_END}" for wallet, n, w in rows))
 
 
 def write_eligible_wallets_latest(path: str, eligible_wallets: Set[str]) -> None:
@@ -429,10 +648,8 @@ def write_eligible_wallets_latest(path: str, eligible_wallets: Set[str]) -> None
         wallet
     """
     with open(path, "w", newline="", encoding="utf-8") as f:
-        writer = csv.writer(f)
-        writer.writerow(["wallet"])
-        for w in sorted(eligible_wallets):
-            writer.writerow([w])
+        f.write("wallet" + CSV_LINE_END)
+        f.write("".join(w + CSV_LINE_END for w in sorted(eligible_wallets)))
 
 
 # ---------------------------------------------------------------------------
@@ -459,7 +676,7 @@ def main():
     eligible_latest_path = sys.argv[8]
 
     # Load inputs
-    counts_all = load_vote_counts(vote_counts_path)
+    counts_all = Counter(load_vote_counts(vote_counts_path))
     eligible_wallets = load_wallet_list_csv(eligible_wallets_path)
 
     active_proposals = load_proposals_csv_ids(active_proposals_path)
@@ -488,19 +705,25 @@ def main():
             }
         )
 
-        # 1) Update counts using ALL active proposals (counting set).
-        counts_all = update_counts_with_active_proposals(
-            session=session,
-            active_proposals=active_proposals,
-            counts_all_wallets=counts_all,
-            alias_map=alias_map,
+        # Fetch voters once per proposal (AGIPActive is a subset of ActiveProposals).
+        voters_by_proposal = fetch_voters_for_proposals(
+            session,
+            [p.id for p in active_proposals] + [p.id for p in AGIPActive_proposals],
         )
 
-        # 2) Update eligibility using ONLY AGIPActive proposals (eligibility set).
-        newly_eligible_from_agip = compute_newly_eligible_from_AGIPActive(
-            session=session,
-            AGIPActive_proposals=AGIPActive_proposals,
-        )
+    # 1) Update counts using ALL active proposals (counting set).
+    counts_all = update_counts_with_active_proposals(
+        voters_by_proposal=voters_by_proposal,
+        active_proposals=active_proposals,
+        counts_all_wallets=counts_all,
+        alias_map=alias_map,
+    )
+
+    # 2) Update eligibility using ONLY AGIPActive proposals (eligibility set).
+    newly_eligible_from_agip = compute_newly_eligible_from_AGIPActive(
+        voters_by_proposal=voters_by_proposal,
+        AGIPActive_proposals=AGIPActive_proposals,
+    )
 
     # Update eligible set (per-wallet, no aliasing).
     eligible_wallets_updated = set(eligible_wallets)